@@ -0,0 +1,20 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Bumped in the same transaction as every user edit to activities or tags, so
+-- the web workers' in-memory caches and HTTP validators can key on it
+CREATE TABLE data_revision (
+  id TEXT PRIMARY KEY CHECK (id='default'),
+  revision INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_revision (id, revision) VALUES ('default', 0);
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+DROP TABLE IF EXISTS data_revision;
+
+-- +goose StatementEnd
@@ -0,0 +1,19 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+log() { printf '[clepsy-gliner-entrypoint] %s\n' "$*"; }
+
+# Assume these are provided in the environment
+PUID="${CLEPSY_UID}"
+PGID="${CLEPSY_GID}"
+
+# Run shared permission/user setup
+/app/scripts/fix_permissions.sh
+
+# The socket directory is a volume shared with the Dramatiq worker
+SOCKET_DIR="$(dirname "${GLINER_SERVER_ADDRESS}")"
+mkdir -p "${SOCKET_DIR}"
+chown "${PUID}:${PGID}" "${SOCKET_DIR}"
+
+log "Starting GLiNER inference server..."
+exec gosu "${PUID}:${PGID}" uv run python -m clepsy.modules.pii.inference_server
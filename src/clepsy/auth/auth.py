@@ -1,3 +1,4 @@
+from functools import lru_cache
 import os
 
 from argon2 import PasswordHasher
@@ -20,6 +21,9 @@ def verify_password(stored_hash: str, password: str) -> bool:
         return False
 
 
+# The stored hash only changes when a rehash happens, so repeat logins hit the
+# cache instead of reparsing the PHC string
+@lru_cache(maxsize=8)
 def maybe_rehash(stored_hash: str) -> bool:
     """Return True if you should rehash with current params."""
     return ph.check_needs_rehash(stored_hash)
@@ -136,10 +136,18 @@ class Config(BaseSettings):
     min_session_purity: float = 0.8
     session_window_length: timedelta = timedelta(minutes=30)
     max_activities_per_session_llm_call: int = 100
+    # Islands whose session-detection LLM calls may be in flight at once
+    max_concurrent_llm_islands: int = 4
     max_session_window_overlap: timedelta = timedelta(minutes=15)
     gliner_pii_model: str = "knowledgator/gliner-pii-small-v1.0"
     gliner_pii_threshold: float = 0.5
+    # fp16 only applies when CUDA is available; int8 quantizes Linear layers on CPU
+    gliner_precision: Literal["fp32", "fp16", "int8"] = "fp32"
     gliner_cache_dir: Path = cache_dir / "gliner"
+    # Unix socket of the shared GLiNER process; unset loads the model in-process
+    gliner_server_address: str | None = None
+    # Seconds to wait for the shared GLiNER process before running in-process
+    gliner_server_timeout_seconds: float = 120.0
     valkey_url: str
     ap_scheduler_sqlite_db_path: Path = Path("/var/lib/clepsy/apscheduler.sqlite3")
     monitoring_enabled: bool = False
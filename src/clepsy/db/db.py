@@ -24,7 +24,8 @@ async def get_db_connection(
     busy_timeout: int = 5000,
     transaction_type: TransactionTypes = "IMMEDIATE",
     pragma_synchronous: str = "NORMAL",
-    cache_size: int = 2000,
+    cache_size: int = -65536,
+    mmap_size: int = 2147483648,
 ) -> AsyncGenerator[aiosqlite.Connection, None]:
     connection_kwargs = {}
 
@@ -44,6 +45,7 @@ async def get_db_connection(
         PRAGMA busy_timeout={busy_timeout};
         PRAGMA foreign_keys=true;
         PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size={mmap_size};
         """
         await conn.executescript(pragma_string)
         if start_transaction:
@@ -64,6 +66,8 @@ async def get_db_connection(
 async def db_setup():
     async with get_db_connection(start_transaction=False) as conn:
         await conn.execute("PRAGMA journal_mode=WAL")
+        # Refresh query planner statistics once per process start
+        await conn.execute("PRAGMA optimize")
 
     aiosqlite.register_adapter(datetime, adapters.adapt_timestamp)
 
@@ -56,6 +56,7 @@ from clepsy.entities import (
     ProductivityLevel,
     Session,
     SessionizationRun,
+    SessionToActivity,
     SourceEnrollmentCode,
     SourceStatus,
     SourceType,
@@ -2279,10 +2280,60 @@ async def update_activity_event(
     )
 
 
+def _tag_filter_clause(
+    tag_ids: Sequence[int], include_untagged: bool
+) -> tuple[str, dict[str, Any]]:
+    """Builds an activity-id filter matching the tag selection of the UI.
+
+    An activity matches when it carries one of ``tag_ids`` or, with
+    ``include_untagged``, when it carries no (non-deleted) tag at all.
+    """
+    params: dict[str, Any] = {f"tag_{i}": tag_id for i, tag_id in enumerate(tag_ids)}
+    conditions = []
+    if params:
+        tag_placeholders = ",".join(f":{name}" for name in params)
+        conditions.append(
+            f"""EXISTS (
+                SELECT 1
+                FROM tag_mappings tm
+                JOIN tags t ON t.id = tm.tag_id AND t.deleted_at IS NULL
+                WHERE tm.activity_id = a.id
+                  AND tm.tag_id IN ({tag_placeholders})
+            )"""
+        )
+    if include_untagged:
+        conditions.append(
+            """NOT EXISTS (
+                SELECT 1
+                FROM tag_mappings tm
+                JOIN tags t ON t.id = tm.tag_id AND t.deleted_at IS NULL
+                WHERE tm.activity_id = a.id
+            )"""
+        )
+    if not conditions:
+        return "AND 0", params
+    return f"AND ({' OR '.join(conditions)})", params
+
+
 async def select_specs_in_time_range(
-    conn: aiosqlite.Connection, start: datetime, end: datetime
+    conn: aiosqlite.Connection,
+    start: datetime,
+    end: datetime,
+    *,
+    tag_ids: Sequence[int] | None = None,
+    include_untagged: bool = False,
 ) -> list[DBActivitySpec]:
-    activity_ids_query = """
+    """Selects specs active in the window.
+
+    Passing ``tag_ids`` restricts the result to activities carrying one of
+    those tags (plus untagged ones with ``include_untagged``) in SQL.
+    """
+    tag_filter, tag_params = (
+        _tag_filter_clause(tag_ids, include_untagged)
+        if tag_ids is not None
+        else ("", {})
+    )
+    activity_ids_query = f"""
         SELECT DISTINCT a.id
         FROM activities a
         WHERE (
@@ -2303,9 +2354,12 @@ async def select_specs_in_time_range(
                 LIMIT 1
             ) = 'open'
         )
+        {tag_filter}
     """
 
-    async with conn.execute(activity_ids_query, {"start": start, "end": end}) as cursor:
+    async with conn.execute(
+        activity_ids_query, {"start": start, "end": end, **tag_params}
+    ) as cursor:
         rows = await cursor.fetchall()
         activity_ids = [row["id"] for row in rows]
 
@@ -2370,10 +2424,17 @@ async def select_specs_in_time_range(
 
 
 async def select_specs_with_tags_in_time_range(
-    conn: aiosqlite.Connection, start: datetime, end: datetime
+    conn: aiosqlite.Connection,
+    start: datetime,
+    end: datetime,
+    *,
+    tag_ids: Sequence[int] | None = None,
+    include_untagged: bool = False,
 ) -> list[DBActivitySpecWithTags]:
     # First get regular activity specs
-    activity_specs = await select_specs_in_time_range(conn, start, end)
+    activity_specs = await select_specs_in_time_range(
+        conn, start, end, tag_ids=tag_ids, include_untagged=include_untagged
+    )
 
     # Now fetch tags for each activity
     tags_by_activity = {}
@@ -2448,6 +2509,22 @@ async def select_last_aggregation(conn: aiosqlite.Connection) -> DBAggregation |
             )
 
 
+async def select_data_revision(conn: aiosqlite.Connection) -> int:
+    async with conn.execute(
+        "SELECT revision FROM data_revision WHERE id = 'default'"
+    ) as cursor:
+        row = await cursor.fetchone()
+    return row["revision"] if row else 0
+
+
+async def bump_data_revision(conn: aiosqlite.Connection) -> None:
+    # Run inside the edit's transaction so the new revision and the edited rows
+    # become visible to every process at the same commit
+    await conn.execute(
+        "UPDATE data_revision SET revision = revision + 1 WHERE id = 'default'"
+    )
+
+
 async def select_latest_aggregation(
     conn: aiosqlite.Connection,
 ) -> DBAggregation | None:
@@ -3104,7 +3181,7 @@ async def insert_sessions(
 
 async def insert_session_to_activity(
     conn: aiosqlite.Connection,
-    mappings: Sequence[tuple[int, int]],
+    mappings: Sequence[SessionToActivity],
 ) -> None:
     if not mappings:
         return
@@ -3114,7 +3191,7 @@ async def insert_session_to_activity(
         INSERT INTO session_to_activity (session_id, activity_id)
         VALUES (?, ?)
         """,
-        mappings,
+        [(mapping.session_id, mapping.activity_id) for mapping in mappings],
     )
 
 
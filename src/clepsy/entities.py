@@ -354,13 +354,20 @@ class DBActivitySpec(BaseModel):
     def ended(self) -> bool:
         return self.end_time is not None
 
+    def with_events(self, events: list[DBActivityEvent]) -> "DBActivitySpec":
+        """Returns a copy of this spec carrying ``events`` instead of its own."""
+        return DBActivitySpec(activity=self.activity, events=events)
+
     def to_tz(self, tz: tzinfo) -> "DBActivitySpec":
+        # Already in ``tz``: there is nothing to convert, so skip the copy
+        if all(event.event_time.tzinfo is tz for event in self.events):
+            return self
         new_events = []
         for event in self.events:
             new_event = event.model_copy()
             new_event.event_time = event.event_time.astimezone(tz)
             new_events.append(new_event)
-        return DBActivitySpec(activity=self.activity, events=new_events)
+        return self.with_events(new_events)
 
 
 class DBActivitySpecWithTags(DBActivitySpec):
@@ -368,14 +375,20 @@ class DBActivitySpecWithTags(DBActivitySpec):
 
     tags: list[DBTag] = []
 
-    def to_tz(self, tz: tzinfo) -> "DBActivitySpecWithTags":
-        # First get the base conversion done by the parent class
-        base_spec = super().to_tz(tz)
-
-        # Then create a new DBActivitySpecWithTags instance with the converted data
-        # but keeping our tags
+    @cached_property
+    def tag_mask(self) -> int:
+        """Returns the tag ids as a bitmask, with bit ``id`` set per tag."""
+        mask = 0
+        for tag in self.tags:
+            mask |= 1 << tag.id
+        return mask
+
+    def with_events(
+        self, events: list[DBActivityEvent]
+    ) -> "DBActivitySpecWithTags":
+        # Keep our tags alongside the replacement events
         return DBActivitySpecWithTags(
-            activity=base_spec.activity, events=base_spec.events, tags=self.tags
+            activity=self.activity, events=events, tags=self.tags
         )
 
     def __hash__(self):
@@ -399,15 +412,14 @@ class DBActivitySpecWithTagsAndSessions(DBActivitySpecWithTags):
     session: "DBSession | None" = None
     candidate_sessions: list["DBCandidateSession"] = []
 
-    def to_tz(self, tz: tzinfo) -> "DBActivitySpecWithTagsAndSessions":
-        # First get the base conversion done by the parent class
-        base_spec = super().to_tz(tz)
-
-        # Then create a new instance with the converted data but keeping relationships
+    def with_events(
+        self, events: list[DBActivityEvent]
+    ) -> "DBActivitySpecWithTagsAndSessions":
+        # Keep tags and session relationships alongside the replacement events
         return DBActivitySpecWithTagsAndSessions(
-            activity=base_spec.activity,
-            events=base_spec.events,
-            tags=base_spec.tags,
+            activity=self.activity,
+            events=events,
+            tags=self.tags,
             session=self.session,
             candidate_sessions=self.candidate_sessions,
         )
@@ -77,6 +77,8 @@ def create_base_page(
         # Duration picker utility
         script(src="/static/custom_scripts/clepsy_chart.js", defer=False),
         script(src="/static/custom_scripts/time_duration_picker.js", defer=False),
+        # Home page Alpine state; must be defined before Alpine initializes
+        script(src="/static/custom_scripts/home_xdata.js", defer=False),
     ]
 
     styles = [
@@ -172,6 +172,25 @@ def create_search_element(placeholder: str, listbox_id: str) -> Markup:
     )
 
 
+_SELECT_X_DATA_TEMPLATE = utils.compile_template(
+    """
+    {
+        selected_val: '[[$selected_val]]',
+        show: false,
+        open() { this.show = true },
+        close() { this.show = false },
+        isOpen() { return this.show === true },
+        select(value, text) {
+            this.selected_val = value;
+            this.$refs.hiddenInput.value = value;
+            this.$refs.button.querySelector('.truncate').textContent = text;
+            this.close();
+            this.$dispatch('change', { value: value });
+        }
+    }"""
+)
+
+
 def create_single_select(
     element_id: str,
     name: str,
@@ -209,24 +228,7 @@ def create_single_select(
         else:
             raise ValueError(f"selected_val '{selected_val}' not found in options")
 
-    x_data_str = """
-    {
-        selected_val: '[[$selected_val]]',
-        show: false,
-        open() { this.show = true },
-        close() { this.show = false },
-        isOpen() { return this.show === true },
-        select(value, text) {
-            this.selected_val = value;
-            this.$refs.hiddenInput.value = value;
-            this.$refs.button.querySelector('.truncate').textContent = text;
-            this.close();
-            this.$dispatch('change', { value: value });
-        }
-    }"""
-
-    x_data_str = utils.substitute_template(
-        x_data_str,
+    x_data_str = _SELECT_X_DATA_TEMPLATE(
         {
             "selected_val": selected_val
             if selected_val is not None
@@ -12,6 +12,7 @@ from loguru import logger
 from clepsy.db.db import get_db_connection
 from clepsy.db.deps import get_user_settings
 from clepsy.db.queries import (
+    bump_data_revision,
     insert_activities,
     insert_activity_events,
     insert_tag_mappings,
@@ -300,6 +301,7 @@ async def add_activity(
             tag_mapping_insert_task = insert_tag_mappings(conn, db_tag_mapping)
             event_insert_task = insert_activity_events(conn, db_events_to_insert)
             await asyncio.gather(tag_mapping_insert_task, event_insert_task)
+            await bump_data_revision(conn)
 
         response = JSONResponse(content="", status_code=200)
         response.headers["HX-Trigger"] = json.dumps(
@@ -14,6 +14,7 @@ from clepsy import utils
 from clepsy.db.db import get_db_connection
 from clepsy.db.deps import get_user_settings
 from clepsy.db.queries import (
+    bump_data_revision,
     delete_activity,  # Import delete_activity query
     delete_activity_events,
     delete_tag_mappings,
@@ -390,6 +391,7 @@ async def update_activity(
             tasks.append(insert_task)
 
             await asyncio.gather(*tasks)
+            await bump_data_revision(conn)
 
             updated_modal = await render_edit_activity_modal_content(
                 activity_spec=await select_activity_spec_with_tags(conn, activity_id),
@@ -423,6 +425,7 @@ async def handle_delete_activity(activity_id: int):
         logger.info(f"Attempting to delete activity {activity_id}")
         async with get_db_connection(start_transaction=True) as conn:
             await delete_activity(conn, activity_id)
+            await bump_data_revision(conn)
             logger.info(f"Successfully deleted activity {activity_id}")
 
         response = HTMLResponse(content="", status_code=200)  # OK status
@@ -1,5 +1,10 @@
 """JSON serializers for different activity spec types."""
 
+from datetime import datetime
+import threading
+from typing import Sequence
+import weakref
+
 from clepsy import utils
 from clepsy.entities import (
     DBActivitySpec,
@@ -32,7 +37,7 @@ def db_activity_spec_to_json_serializable(
     for event in spec.events:
         event_data = {
             "event_type": event.event_type.value,
-            "event_time": utils.datetime_to_iso_8601(event.event_time),
+            "event_time": event.event_time.replace(tzinfo=None).isoformat(),
             "id": event.id,
             "aggregation_id": event.aggregation_id,
             "activity_id": event.activity_id,
@@ -75,7 +80,7 @@ def db_activity_spec_with_tags_to_json_serializable(
     for event in spec.events:
         event_data = {
             "event_type": event.event_type.value,
-            "event_time": utils.datetime_to_iso_8601(event.event_time),
+            "event_time": event.event_time.replace(tzinfo=None).isoformat(),
             "id": event.id,
             "aggregation_id": event.aggregation_id,
             "activity_id": event.activity_id,
@@ -90,6 +95,99 @@ def db_activity_spec_with_tags_to_json_serializable(
     return result
 
 
+# id(spec) -> (weakref to spec, version token, serialized dict). Keyed on
+# identity because spec __eq__/__hash__ only look at the activity id, which
+# would conflate copies of the same spec in different timezones.
+_serialized_specs_with_tags: dict[int, tuple[weakref.ref, tuple, dict]] = {}
+
+
+def _spec_version(spec: DBActivitySpecWithTags) -> tuple[int, datetime | None, int]:
+    last_event_time = spec.events[-1].event_time if spec.events else None
+    return (len(spec.events), last_event_time, len(spec.tags))
+
+
+def cached_db_activity_spec_with_tags_to_json_serializable(
+    spec: DBActivitySpecWithTags,
+) -> dict:
+    """
+    Memoized variant of db_activity_spec_with_tags_to_json_serializable.
+
+    The same spec objects are rendered by several insights charts per request,
+    so the serialized dict is kept for as long as the spec is alive. Callers
+    must treat the returned dict as read-only.
+
+    Args:
+        spec: The DBActivitySpecWithTags object to convert.
+
+    Returns:
+        A dictionary that can be directly serialized to JSON using json.dumps().
+    """
+    key = id(spec)
+    version = _spec_version(spec)
+    entry = _serialized_specs_with_tags.get(key)
+    if entry is not None and entry[0]() is spec and entry[1] == version:
+        return entry[2]
+
+    data = db_activity_spec_with_tags_to_json_serializable(spec)
+    ref = weakref.ref(
+        spec, lambda _, key=key: _serialized_specs_with_tags.pop(key, None)
+    )
+    _serialized_specs_with_tags[key] = (ref, version, data)
+    return data
+
+
+_SPECS_PLACEHOLDER = "__ACTIVITY_SPECS__"
+
+# The most recent specs array, as (spec refs, spec versions, JSON array)
+_last_specs_fragment: tuple[list[weakref.ref], list[tuple], str] | None = None
+# Charts may be built on worker threads; the first one encodes, the rest wait
+_specs_fragment_lock = threading.Lock()
+
+
+def _specs_with_tags_json_array(specs: Sequence[DBActivitySpecWithTags]) -> str:
+    global _last_specs_fragment
+
+    with _specs_fragment_lock:
+        versions = [_spec_version(spec) for spec in specs]
+        entry = _last_specs_fragment
+        if (
+            entry is not None
+            and len(entry[0]) == len(specs)
+            and entry[1] == versions
+            and all(ref() is spec for ref, spec in zip(entry[0], specs))
+        ):
+            return entry[2]
+
+        fragment = utils.json_dumps(
+            [cached_db_activity_spec_with_tags_to_json_serializable(s) for s in specs]
+        )
+        _last_specs_fragment = ([weakref.ref(s) for s in specs], versions, fragment)
+        return fragment
+
+
+def dumps_payload_with_specs(
+    activity_specs: Sequence[DBActivitySpecWithTags], payload: dict
+) -> str:
+    """
+    Serializes an insights payload with the specs under 'activity_specs'.
+
+    The charts on one insights page embed the same specs, so the specs array
+    is encoded once and spliced into each payload instead of re-walked by the
+    encoder for every chart.
+
+    Args:
+        activity_specs: The specs to embed, serialized with tags.
+        payload: The remaining payload fields.
+
+    Returns:
+        The JSON string with 'activity_specs' as its first key.
+    """
+    encoded = utils.json_dumps({"activity_specs": _SPECS_PLACEHOLDER, **payload})
+    return encoded.replace(
+        f'"{_SPECS_PLACEHOLDER}"', _specs_with_tags_json_array(activity_specs), 1
+    )
+
+
 def db_activity_spec_with_tags_and_sessions_to_json_serializable(
     spec: DBActivitySpecWithTagsAndSessions,
 ) -> dict:
@@ -119,7 +217,7 @@ def db_activity_spec_with_tags_and_sessions_to_json_serializable(
     for event in spec.events:
         event_data = {
             "event_type": event.event_type.value,
-            "event_time": utils.datetime_to_iso_8601(event.event_time),
+            "event_time": event.event_time.replace(tzinfo=None).isoformat(),
             "id": event.id,
             "aggregation_id": event.aggregation_id,
             "activity_id": event.activity_id,
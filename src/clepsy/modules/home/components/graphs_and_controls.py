@@ -1,19 +1,12 @@
-from datetime import datetime, timezone
+from datetime import datetime
 import json
-from zoneinfo import ZoneInfo
 
 import aiosqlite
 from htpy import Element, div, form
 
 # from datetime import timedelta  # no longer used here
 from clepsy import utils
-from clepsy.db.queries import (
-    select_last_aggregation,
-    select_specs_with_tags_and_sessions_in_time_range,
-    select_tags,
-    select_user_settings,
-)
-from clepsy.entities import DBTag, ViewMode, get_view_mode_label
+from clepsy.entities import DBTag, UserSettings, ViewMode, get_view_mode_label
 from clepsy.frontend.components import (
     create_button,
     create_generic_modal,
@@ -21,10 +14,14 @@ from clepsy.frontend.components import (
     create_single_select,
     create_time_nav_group,
 )
+from clepsy.modules.home.service import build_diagram_context
 
 from .unified_diagram import create_unified_diagram_container
 
 
+_VIEW_MODE_OPTIONS = {get_view_mode_label(mode): mode.value for mode in ViewMode}
+
+
 def create_controls(
     all_tags: list[DBTag],
     selected_tag_ids: list[int],
@@ -34,7 +31,7 @@ def create_controls(
         element_id="view-mode-selector",
         name="view_mode",
         x_model="view_mode",
-        options={get_view_mode_label(mode): mode.value for mode in ViewMode},
+        options=_VIEW_MODE_OPTIONS,
         selected_val=selected_view_mode.value,
         title=None,
         outer_div_attrs_update={
@@ -104,51 +101,27 @@ def create_controls(
 
 async def create_graphs_and_controls(
     conn: aiosqlite.Connection,
+    user_settings: UserSettings,
     reference_date_user_tz: datetime,
-    current_time_user_tz: datetime,  # Add current time parameter
     view_mode: ViewMode,
     offset: int,
     selected_tag_ids: list[int],
+    all_tags: list[DBTag],
 ):
-    # Get user settings and timezone
-    user_settings = await select_user_settings(conn)
-    if user_settings is None:
-        raise ValueError("User settings not found in the database")
-    user_tz = ZoneInfo(user_settings.timezone)
+    user_tz = utils.get_zoneinfo(user_settings.timezone)
 
     if not reference_date_user_tz.tzinfo == user_tz:
         raise ValueError("Reference date timezone does not match user timezone")
 
-    start_time_user_tz, end_time_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=reference_date_user_tz,
+    context = await build_diagram_context(
+        conn=conn,
+        user_settings=user_settings,
         view_mode=view_mode,
         offset=offset,
-    )
-    start_time_utc = start_time_user_tz.astimezone(timezone.utc)
-    end_time_utc = end_time_user_tz.astimezone(timezone.utc)
-
-    db_activity_specs_with_tags_and_sessions = (
-        await select_specs_with_tags_and_sessions_in_time_range(
-            conn=conn,
-            start=start_time_utc,
-            end=end_time_utc,
-        )
+        reference_date_user_tz=reference_date_user_tz,
+        selected_tag_ids=selected_tag_ids,
     )
 
-    db_activity_specs_with_tags_and_sessions_user_tz = [
-        x.to_tz(user_tz) for x in db_activity_specs_with_tags_and_sessions
-    ]
-
-    last_aggregation = await select_last_aggregation(conn=conn)
-    if last_aggregation:
-        last_aggregation_end_time_utc = last_aggregation.end_time
-        last_aggregation_end_time_user_tz = last_aggregation_end_time_utc.astimezone(
-            user_tz
-        )
-    else:
-        last_aggregation_end_time_user_tz = None
-    all_tags = await select_tags(conn)
-
     controls = create_controls(
         all_tags=all_tags,
         selected_tag_ids=selected_tag_ids,
@@ -156,58 +129,23 @@ async def create_graphs_and_controls(
     )
 
     unified_diagram = create_unified_diagram_container(
-        activity_specs=db_activity_specs_with_tags_and_sessions_user_tz,
-        start_time_user_tz=start_time_user_tz,
-        end_time_user_tz=end_time_user_tz,
-        last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
-        current_time_user_tz=current_time_user_tz,
+        activity_specs=context.activity_specs,
+        start_time_user_tz=context.start_time_user_tz,
+        end_time_user_tz=context.end_time_user_tz,
+        last_aggregation_end_time_user_tz=context.last_aggregation_end_time_user_tz,
+        current_time_user_tz=context.current_time_user_tz,
     )
 
-    x_data_str = """{
-            reference_date: '[[$reference_date]]',
-            view_mode: '[[$view_mode]]',
-            selected_tag_ids: [[$selected_tag_ids_json]],
-            offset: [[$offset]],
-            dispatch_events() {
-                console.log('Dispatching events for unified diagram');
-                this.$dispatch('update_unified_diagram')
-            },
-        }"""
-
-    selected_tag_ids_json = json.dumps(selected_tag_ids)
-    x_data_str = utils.substitute_template(
-        x_data_str,
-        {
-            "reference_date": utils.datetime_to_iso_8601(reference_date_user_tz),
-            "view_mode": view_mode.value,
-            "offset": offset,
-            "selected_tag_ids_json": selected_tag_ids_json,
-        },
+    # State and watchers live in /static/custom_scripts/home_xdata.js
+    x_data_str = (
+        "homeXData({reference_date: "
+        f"'{utils.datetime_to_iso_8601(reference_date_user_tz)}', "
+        f"reference_ts: {int(reference_date_user_tz.timestamp())}, "
+        f"view_mode: '{view_mode.value}', "
+        f"selected_tag_ids: {json.dumps(selected_tag_ids)}, "
+        f"offset: {offset}}})"
     )
 
-    # Convert the x_init to a single line to avoid HTML escaping issues with multiline strings
-    x_init_str = """
-$watch(() => view_mode, (newValue, oldValue) => {
-    console.log('View mode changed from', oldValue, 'to', newValue);
-    if (offset != 0) {
-        offset = 0;
-    } else {
-        dispatch_events();
-        $dispatch('date_range_changed');
-    }
-});
-$watch(() => selected_tag_ids, () => {
-    console.log('Selected tags changed:', selected_tag_ids);
-    dispatch_events();
-});
-$watch(() => offset, () => {
-    console.log('Offset changed:', offset);
-    $dispatch('date_range_changed');
-    dispatch_events();
-});
-
-""".strip()
-
     activity_edit_modal = create_generic_modal(
         modal_id="edit-activity-modal",
         content_id="edit-activity-modal-content",
@@ -217,7 +155,6 @@ $watch(() => offset, () => {
     return div(
         id="graphs-and-controls",
         x_data=x_data_str,
-        x_init=x_init_str,
     )[
         div(
             id="graphs-and-controls-container", class_="card overflow-y-auto scrollbar"
@@ -1,5 +1,5 @@
+from collections import OrderedDict
 from datetime import datetime
-import json
 
 from htpy import div, script
 from loguru import logger
@@ -55,6 +55,61 @@ def _spec_overlaps_window(
     return False
 
 
+# Serialized specs reused across renders, keyed on everything the JSON depends on
+SPEC_JSON_CACHE_SIZE = 4096
+_spec_json_cache: OrderedDict[tuple, dict] = OrderedDict()
+
+
+def _spec_cache_key(spec: DBActivitySpecWithTagsAndSessions) -> tuple:
+    activity = spec.activity
+    return (
+        activity.id,
+        activity.name,
+        activity.description,
+        activity.productivity_level,
+        activity.source,
+        tuple(
+            (
+                e.id,
+                e.event_type,
+                e.event_time,
+                e.event_time.utcoffset(),
+                e.aggregation_id,
+            )
+            for e in spec.events
+        ),
+        tuple((t.id, t.name, t.description) for t in spec.tags),
+        (spec.session.id, spec.session.name, spec.session.llm_id)
+        if spec.session
+        else None,
+        tuple((cs.id, cs.name, cs.llm_id) for cs in spec.candidate_sessions),
+    )
+
+
+def _serialize_spec(spec: DBActivitySpecWithTagsAndSessions) -> dict:
+    """Returns the spec's JSON-serializable dict, memoized while unchanged."""
+    key = _spec_cache_key(spec)
+    cached = _spec_json_cache.get(key)
+    if cached is not None:
+        _spec_json_cache.move_to_end(key)
+        return cached
+
+    data = db_activity_spec_with_tags_and_sessions_to_json_serializable(spec)
+    _spec_json_cache[key] = data
+    if len(_spec_json_cache) > SPEC_JSON_CACHE_SIZE:
+        _spec_json_cache.popitem(last=False)
+    return data
+
+
+# Pre-rendered payload for windows without activity, skipping the encoder
+_EMPTY_PAYLOAD_TEMPLATE = (
+    '{"activity_specs":[],"start_date":"%s","end_date":"%s",'
+    '"last_aggregation_end_time":%s,"current_time":"%s",'
+    '"metadata":{"activity_count":0,"original_activity_count":%d,'
+    '"window_seconds":%d}}'
+)
+
+
 def build_unified_diagram_payload(
     activity_specs,
     start_time_user_tz,
@@ -71,20 +126,30 @@ def build_unified_diagram_payload(
         0, int((end_time_user_tz - start_time_user_tz).total_seconds())
     )
 
-    return json.dumps(
+    if not windowed_specs:
+        return _EMPTY_PAYLOAD_TEMPLATE % (
+            start_time_user_tz.replace(tzinfo=None).isoformat(),
+            end_time_user_tz.replace(tzinfo=None).isoformat(),
+            f'"{last_aggregation_end_time_user_tz.replace(tzinfo=None).isoformat()}"'
+            if last_aggregation_end_time_user_tz
+            else "null",
+            current_time_user_tz.replace(tzinfo=None).isoformat(),
+            len(activity_specs),
+            window_seconds,
+        )
+
+    # Datetimes are passed naive so the output matches utils.datetime_to_iso_8601
+    return utils.json_dumps(
         {
-            "activity_specs": [
-                db_activity_spec_with_tags_and_sessions_to_json_serializable(s)
-                for s in windowed_specs
-            ],
-            "start_date": utils.datetime_to_iso_8601(start_time_user_tz),
-            "end_date": utils.datetime_to_iso_8601(end_time_user_tz),
-            "last_aggregation_end_time": utils.datetime_to_iso_8601(
-                last_aggregation_end_time_user_tz
+            "activity_specs": [_serialize_spec(s) for s in windowed_specs],
+            "start_date": start_time_user_tz.replace(tzinfo=None),
+            "end_date": end_time_user_tz.replace(tzinfo=None),
+            "last_aggregation_end_time": last_aggregation_end_time_user_tz.replace(
+                tzinfo=None
             )
             if last_aggregation_end_time_user_tz
             else None,
-            "current_time": utils.datetime_to_iso_8601(current_time_user_tz),
+            "current_time": current_time_user_tz.replace(tzinfo=None),
             "metadata": {
                 "activity_count": len(windowed_specs),
                 "original_activity_count": len(activity_specs),
@@ -125,9 +190,9 @@ def create_unified_diagram_container(
     last_aggregation_end_time_user_tz: datetime | None,
     current_time_user_tz: datetime,
 ):
-    logger.info(
+    logger.opt(lazy=True).debug(
         "Creating unified diagram container with {} activity specs",
-        len(activity_specs),
+        lambda: len(activity_specs),
     )
 
     body = create_unified_diagram_body(
@@ -145,7 +210,7 @@ def create_unified_diagram_container(
             "hx-trigger": "update_unified_diagram from:body",
             "hx-swap": "innerHTML",  # only swap the body
             "x-bind:hx-vals": (
-                "JSON.stringify({reference_date: reference_date, "
+                "JSON.stringify({reference_ts: reference_ts, "
                 "view_mode: view_mode, offset: offset, "
                 "selected_tag_ids: JSON.stringify(selected_tag_ids)})"
             ),
@@ -1,5 +1,4 @@
 from datetime import datetime
-from zoneinfo import ZoneInfo
 
 import aiosqlite
 
@@ -33,7 +32,7 @@ async def create_home_page(
     conn: aiosqlite.Connection, user_settings: UserSettings
 ) -> Element:
     # Get user settings to determine the timezone (needed for formatting only now)
-    user_timezone = ZoneInfo(user_settings.timezone)
+    user_timezone = utils.get_zoneinfo(user_settings.timezone)
     current_user_time = datetime.now(user_timezone)
 
     assert (
@@ -55,11 +54,12 @@ async def create_home_page(
 
     graphs_and_controls = await create_graphs_and_controls(
         conn=conn,
+        user_settings=user_settings,
         reference_date_user_tz=start_of_day_user_tz,
-        current_time_user_tz=current_user_time,  # Pass current time
         view_mode=ViewMode.DAILY,
         offset=0,
         selected_tag_ids=selected_tag_ids,
+        all_tags=all_tags,
     )
 
     return create_standard_content(
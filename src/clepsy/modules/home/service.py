@@ -0,0 +1,119 @@
+"""Data loading shared by the home page and the unified diagram refresh."""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from aiocache import SimpleMemoryCache
+import aiosqlite
+
+from clepsy import utils
+from clepsy.db.queries import (
+    select_data_revision,
+    select_last_aggregation,
+    select_specs_with_tags_and_sessions_in_time_range,
+)
+from clepsy.entities import DBActivitySpecWithTagsAndSessions, UserSettings, ViewMode
+
+
+# Edits and sessionization runs bump the data revision in the cache key, so
+# entries only need to live long enough to serve repeated refreshes.
+diagram_specs_ttl = 30  # seconds
+
+_diagram_specs_cache = SimpleMemoryCache()
+
+
+@dataclass(frozen=True)
+class DiagramContext:
+    activity_specs: list[DBActivitySpecWithTagsAndSessions]
+    start_time_user_tz: datetime
+    end_time_user_tz: datetime
+    last_aggregation_end_time_user_tz: datetime | None
+    current_time_user_tz: datetime
+
+
+def filter_activities_by_tags(
+    activities: list[DBActivitySpecWithTagsAndSessions], selected_tag_ids: list[int]
+) -> list[DBActivitySpecWithTagsAndSessions]:
+    if not selected_tag_ids:
+        return activities
+
+    no_tag_selected = -1 in selected_tag_ids
+    # One int AND per spec against the specs' memoized tag bitmasks. The ids
+    # come from the request, so only tags the specs actually carry are
+    # shifted in; unknown, negative or huge ids simply match nothing
+    present_tag_ids = {tag.id for activity in activities for tag in activity.tags}
+    selected_mask = 0
+    for tag_id in present_tag_ids.intersection(selected_tag_ids):
+        selected_mask |= 1 << tag_id
+    filtered_activities = [
+        activity
+        for activity in activities
+        if activity.tag_mask & selected_mask or (no_tag_selected and not activity.tags)
+    ]
+    return filtered_activities
+
+
+async def build_diagram_context(
+    conn: aiosqlite.Connection,
+    user_settings: UserSettings,
+    view_mode: ViewMode,
+    offset: int,
+    reference_date_user_tz: datetime,
+    selected_tag_ids: list[int],
+) -> DiagramContext:
+    """Loads everything the unified diagram needs for one window.
+
+    The filtered, user-timezone specs are cached in-process, keyed by the
+    window, the tag selection, the last aggregation end time and the persisted
+    data revision, so a new aggregation, an edit or a sessionization run
+    committed through any process misses the cache.
+    """
+    user_tz = utils.get_zoneinfo(user_settings.timezone)
+    current_time_user_tz = datetime.now(user_tz)
+
+    start_time_user_tz, end_time_user_tz = utils.calculate_date_based_on_view_mode(
+        reference_date=reference_date_user_tz,
+        view_mode=view_mode,
+        offset=offset,
+    )
+
+    # Read before the specs, so a cached entry is never older than its key
+    data_revision = await select_data_revision(conn)
+    last_aggregation = await select_last_aggregation(conn=conn)
+    if last_aggregation:
+        last_aggregation_end_time_user_tz = last_aggregation.end_time.astimezone(
+            user_tz
+        )
+    else:
+        last_aggregation_end_time_user_tz = None
+
+    cache_key = "|".join(
+        [
+            user_settings.timezone,
+            start_time_user_tz.isoformat(),
+            end_time_user_tz.isoformat(),
+            ",".join(str(tag_id) for tag_id in sorted(set(selected_tag_ids))),
+            last_aggregation.end_time.isoformat() if last_aggregation else "none",
+            str(data_revision),
+        ]
+    )
+
+    activity_specs = await _diagram_specs_cache.get(cache_key)
+    if activity_specs is None:
+        specs = await select_specs_with_tags_and_sessions_in_time_range(
+            conn=conn,
+            start=start_time_user_tz.astimezone(timezone.utc),
+            end=end_time_user_tz.astimezone(timezone.utc),
+        )
+        activity_specs = utils.bulk_to_tz(
+            filter_activities_by_tags(specs, selected_tag_ids), user_tz
+        )
+        await _diagram_specs_cache.set(cache_key, activity_specs, ttl=diagram_specs_ttl)
+
+    return DiagramContext(
+        activity_specs=activity_specs,
+        start_time_user_tz=start_time_user_tz,
+        end_time_user_tz=end_time_user_tz,
+        last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
+        current_time_user_tz=current_time_user_tz,
+    )
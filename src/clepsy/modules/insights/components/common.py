@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from clepsy import utils
+
+
+# hx-vals expression shared by every insights chart container
+INSIGHTS_HX_VALS = (
+    "JSON.stringify({reference_date: reference_date, view_mode: view_mode, "
+    "offset: offset, selected_tag_ids: selected_tag_ids})"
+)
+
+
+@lru_cache(maxsize=256)
+def _cached_iso_8601(dt: datetime, utcoffset: timedelta | None) -> str:
+    return utils.datetime_to_iso_8601(dt)
+
+
+def iso_8601(dt: datetime) -> str:
+    """Memoized ``utils.datetime_to_iso_8601`` for the window bounds every
+    insights payload formats.
+
+    Aware datetimes at the same instant compare equal across offsets but
+    format differently, so the offset is part of the cache key.
+    """
+    return _cached_iso_8601(dt, dt.utcoffset())
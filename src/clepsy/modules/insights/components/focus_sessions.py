@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 from datetime import datetime
-import json
-from typing import List, Optional
+from typing import Optional, Sequence
 
 from htpy import div, input as htpy_input
+from markupsafe import Markup
 
 from clepsy import utils
 from clepsy.entities import DBActivitySpecWithTags, ViewMode
 from clepsy.modules.activities.json_serializers import (
-    db_activity_spec_with_tags_to_json_serializable,
+    dumps_payload_with_specs,
 )
+from clepsy.modules.insights.components.common import INSIGHTS_HX_VALS, iso_8601
 
 
 # ---------------------------------------------------------------------------
@@ -20,29 +21,24 @@ from clepsy.modules.activities.json_serializers import (
 
 def _build_payload(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
 ):
-    return json.dumps(
+    return dumps_payload_with_specs(
+        activity_specs,
         {
-            "activity_specs": [
-                db_activity_spec_with_tags_to_json_serializable(s)
-                for s in activity_specs
-            ],
-            "start_date": utils.datetime_to_iso_8601(start_time_user_tz),
-            "end_date": utils.datetime_to_iso_8601(end_time_user_tz),
-            "last_aggregation_end_time": utils.datetime_to_iso_8601(
-                last_aggregation_end_time_user_tz
-            )
+            "start_date": iso_8601(start_time_user_tz),
+            "end_date": iso_8601(end_time_user_tz),
+            "last_aggregation_end_time": iso_8601(last_aggregation_end_time_user_tz)
             if last_aggregation_end_time_user_tz
             else None,
-            "current_time": utils.datetime_to_iso_8601(current_time_user_tz),
+            "current_time": iso_8601(current_time_user_tz),
             "view_mode": view_mode.value,
-        }
+        },
     )
 
 
@@ -53,14 +49,15 @@ def _build_payload(
 
 def create_focus_sessions_calendar_body(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
+    payload_json: Optional[str] = None,
 ):
-    payload = _build_payload(
+    payload = payload_json or _build_payload(
         activity_specs=activity_specs,
         start_time_user_tz=start_time_user_tz,
         end_time_user_tz=end_time_user_tz,
@@ -72,20 +69,21 @@ def create_focus_sessions_calendar_body(
         id="focus_sessions_calendar_chart",
         class_="relative w-full h-auto min-h-[280px] sm:min-h-[340px] overflow-visible",
         x_init="window.initInsightsFocusSessionsCalendarFromJson($el.dataset.focus)",
-        **{"data-focus": payload},
+        **{"data-focus": utils.escape_attr_json(payload)},
     )
 
 
 def create_focus_sessions_histogram_body(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
+    payload_json: Optional[str] = None,
 ):
-    payload = _build_payload(
+    payload = payload_json or _build_payload(
         activity_specs=activity_specs,
         start_time_user_tz=start_time_user_tz,
         end_time_user_tz=end_time_user_tz,
@@ -97,20 +95,21 @@ def create_focus_sessions_histogram_body(
         id="focus_sessions_histogram_chart",
         class_="relative w-full h-auto min-h-[280px] sm:min-h-[340px] overflow-visible",
         x_init="window.initInsightsFocusSessionsHistogramFromJson($el.dataset.focus)",
-        **{"data-focus": payload},
+        **{"data-focus": utils.escape_attr_json(payload)},
     )
 
 
 def create_focus_sessions_stats_body(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
+    payload_json: Optional[str] = None,
 ):
-    payload = _build_payload(
+    payload = payload_json or _build_payload(
         activity_specs=activity_specs,
         start_time_user_tz=start_time_user_tz,
         end_time_user_tz=end_time_user_tz,
@@ -122,7 +121,7 @@ def create_focus_sessions_stats_body(
         id="focus_sessions_stats_panel",
         class_="relative w-full h-auto min-h-[54px] overflow-visible",
         x_init="window.initInsightsFocusSessionsStatsFromJson($el.dataset.focus)",
-        **{"data-focus": payload},
+        **{"data-focus": utils.escape_attr_json(payload)},
     )
 
 
@@ -131,18 +130,15 @@ def create_focus_sessions_stats_body(
 # ---------------------------------------------------------------------------
 
 
-def _hx_common():  # keep hx-vals expression aligned across containers
-    return "JSON.stringify({reference_date: reference_date, view_mode: view_mode, offset: offset, selected_tag_ids: JSON.stringify(selected_tag_ids)})"
-
-
 def create_focus_sessions_calendar_container(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
+    payload_json: Optional[str] = None,
 ):
     body = create_focus_sessions_calendar_body(
         activity_specs=activity_specs,
@@ -151,6 +147,7 @@ def create_focus_sessions_calendar_container(
         last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
         current_time_user_tz=current_time_user_tz,
         view_mode=view_mode,
+        payload_json=payload_json,
     )
     return div(
         id="focus-sessions-calendar-wrapper",
@@ -162,19 +159,20 @@ def create_focus_sessions_calendar_container(
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#focus_sessions_calendar_chart",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": _hx_common(),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[div(class_="w-full overflow-x-auto")[div(class_="min-w-[520px]")[body]]]
 
 
 def create_focus_sessions_histogram_container(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
+    payload_json: Optional[str] = None,
 ):
     body = create_focus_sessions_histogram_body(
         activity_specs=activity_specs,
@@ -183,6 +181,7 @@ def create_focus_sessions_histogram_container(
         last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
         current_time_user_tz=current_time_user_tz,
         view_mode=view_mode,
+        payload_json=payload_json,
     )
     return div(
         id="focus-sessions-histogram-wrapper",
@@ -194,19 +193,20 @@ def create_focus_sessions_histogram_container(
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#focus_sessions_histogram_chart",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": _hx_common(),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[div(class_="w-full overflow-x-auto")[div(class_="min-w-[520px]")[body]]]
 
 
 def create_focus_sessions_stats_container(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
+    payload_json: Optional[str] = None,
 ):
     body = create_focus_sessions_stats_body(
         activity_specs=activity_specs,
@@ -215,6 +215,7 @@ def create_focus_sessions_stats_container(
         last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
         current_time_user_tz=current_time_user_tz,
         view_mode=view_mode,
+        payload_json=payload_json,
     )
     return div(
         id="focus-sessions-stats-wrapper",
@@ -226,7 +227,7 @@ def create_focus_sessions_stats_container(
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#focus_sessions_stats_panel",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": _hx_common(),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[body]
 
@@ -296,15 +297,28 @@ def _settings_inputs():
     ]
 
 
+# The settings inputs never depend on request state; render them once.
+_SETTINGS_INPUTS_HTML = Markup("".join(str(el) for el in _settings_inputs()))
+
+
 def create_focus_sessions_section(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
 ):
+    # The three sub-charts render from the same payload; serialize it once
+    payload_json = _build_payload(
+        activity_specs=activity_specs,
+        start_time_user_tz=start_time_user_tz,
+        end_time_user_tz=end_time_user_tz,
+        last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
+        current_time_user_tz=current_time_user_tz,
+        view_mode=view_mode,
+    )
     stats = create_focus_sessions_stats_container(
         activity_specs=activity_specs,
         start_time_user_tz=start_time_user_tz,
@@ -312,6 +326,7 @@ def create_focus_sessions_section(
         last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
         current_time_user_tz=current_time_user_tz,
         view_mode=view_mode,
+        payload_json=payload_json,
     )
     calendar = create_focus_sessions_calendar_container(
         activity_specs=activity_specs,
@@ -320,6 +335,7 @@ def create_focus_sessions_section(
         last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
         current_time_user_tz=current_time_user_tz,
         view_mode=view_mode,
+        payload_json=payload_json,
     )
     histogram = create_focus_sessions_histogram_container(
         activity_specs=activity_specs,
@@ -328,12 +344,13 @@ def create_focus_sessions_section(
         last_aggregation_end_time_user_tz=last_aggregation_end_time_user_tz,
         current_time_user_tz=current_time_user_tz,
         view_mode=view_mode,
+        payload_json=payload_json,
     )
 
     settings_panel = div(
         id="focus-sessions-settings",
         class_="flex flex-row flex-wrap gap-4 items-center justify-center text-xs",
-    )[_settings_inputs()]
+    )[_SETTINGS_INPUTS_HTML]
 
     # Title should be full-width above the stats/settings row (mobile-friendly)
     top_bar = div(
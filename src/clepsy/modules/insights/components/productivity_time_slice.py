@@ -1,49 +1,44 @@
 from __future__ import annotations
 
 from datetime import datetime
-import json
-from typing import List, Optional
+from typing import Optional, Sequence
 
 from htpy import div
 
 from clepsy import utils
 from clepsy.entities import DBActivitySpecWithTags, ViewMode
 from clepsy.modules.activities.json_serializers import (
-    db_activity_spec_with_tags_to_json_serializable,
+    dumps_payload_with_specs,
 )
+from clepsy.modules.insights.components.common import iso_8601
 
 
 def _build_payload(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
     current_time_user_tz: datetime,
     view_mode: ViewMode,
 ):
-    return json.dumps(
+    return dumps_payload_with_specs(
+        activity_specs,
         {
-            "activity_specs": [
-                db_activity_spec_with_tags_to_json_serializable(s)
-                for s in activity_specs
-            ],
-            "start_date": utils.datetime_to_iso_8601(start_time_user_tz),
-            "end_date": utils.datetime_to_iso_8601(end_time_user_tz),
-            "last_aggregation_end_time": utils.datetime_to_iso_8601(
-                last_aggregation_end_time_user_tz
-            )
+            "start_date": iso_8601(start_time_user_tz),
+            "end_date": iso_8601(end_time_user_tz),
+            "last_aggregation_end_time": iso_8601(last_aggregation_end_time_user_tz)
             if last_aggregation_end_time_user_tz
             else None,
-            "current_time": utils.datetime_to_iso_8601(current_time_user_tz),
+            "current_time": iso_8601(current_time_user_tz),
             "view_mode": view_mode.value,
-        }
+        },
     )
 
 
 def create_productivity_time_slice_body(
     *,
-    activity_specs: List[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: Optional[datetime],
@@ -64,5 +59,5 @@ def create_productivity_time_slice_body(
         # Allow vertical overflow only so horizontal size stays stable; smaller min-h on mobile.
         class_="relative w-full h-auto min-h-[280px] sm:min-h-[320px] overflow-x-hidden overflow-y-visible",
         x_init="window.initInsightsProductivityTimeSliceFromJson($el.dataset.productivity)",
-        **{"data-productivity": payload},
+        **{"data-productivity": utils.escape_attr_json(payload)},
     )
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from datetime import datetime
-import json
-from typing import Any, List
+import heapq
+from typing import Any, Sequence
 
 from htpy import div, script
+import numpy as np
 
 from clepsy import utils
+from clepsy.modules.insights.components.common import INSIGHTS_HX_VALS, iso_8601
 
 
 DBActivitySpecWithTags = Any
@@ -16,23 +17,8 @@ DBActivitySpecWithTags = Any
 MAX_TAGS = 10
 
 
-@dataclass
-class _TagInfo:
-    id: int
-    name: str
-    count: int
-
-
-def _clamp_interval(
-    start: datetime, end: datetime, window_start: datetime, window_end: datetime
-) -> tuple[datetime, datetime] | None:
-    if end <= window_start or start >= window_end:
-        return None
-    clamped_start = start if start >= window_start else window_start
-    clamped_end = end if end <= window_end else window_end
-    if clamped_end <= clamped_start:
-        return None
-    return clamped_start, clamped_end
+# Below this many events the per-call NumPy overhead outweighs the loop.
+_VECTORIZE_MIN_EVENTS = 64
 
 
 def _activity_intervals_within_window(
@@ -40,7 +26,11 @@ def _activity_intervals_within_window(
     window_start: datetime,
     window_end: datetime,
 ) -> list[tuple[datetime, datetime]]:
-    events = sorted(spec.events, key=lambda e: e.event_time)
+    # Memoized on the spec, so repeat renders of the same specs skip the sort
+    events = spec.sorted_events
+    if len(events) >= _VECTORIZE_MIN_EVENTS:
+        return _activity_intervals_within_window_np(events, window_start, window_end)
+
     intervals: list[tuple[datetime, datetime]] = []
     open_time: datetime | None = None
 
@@ -48,24 +38,72 @@ def _activity_intervals_within_window(
         if event.event_type == "open":
             open_time = event.event_time
         elif event.event_type == "close" and open_time:
-            clamped = _clamp_interval(
-                open_time, event.event_time, window_start, window_end
-            )
-            if clamped:
-                intervals.append(clamped)
+            # Clamp to the window inline; an empty result means no overlap
+            start = open_time if open_time >= window_start else window_start
+            end = event.event_time if event.event_time <= window_end else window_end
+            if end > start:
+                intervals.append((start, end))
             open_time = None
 
     if open_time:
-        clamped = _clamp_interval(open_time, window_end, window_start, window_end)
-        if clamped:
-            intervals.append(clamped)
+        start = open_time if open_time >= window_start else window_start
+        if window_end > start:
+            intervals.append((start, window_end))
 
     intervals.sort(key=lambda pair: pair[0])
     return intervals
 
 
+def _activity_intervals_within_window_np(
+    events: list,
+    window_start: datetime,
+    window_end: datetime,
+) -> list[tuple[datetime, datetime]]:
+    """Vectorized equivalent of the loop in _activity_intervals_within_window.
+
+    ``events`` must already be sorted by time. A close yields an interval
+    exactly when the event before it is an open, and a trailing open runs to
+    the window end; survivors are mapped back to the original datetimes.
+    """
+    n = len(events)
+    times = np.fromiter(
+        (e.event_time.timestamp() for e in events), dtype=np.float64, count=n
+    )
+    is_open = np.fromiter(
+        (e.event_type == "open" for e in events), dtype=np.bool_, count=n
+    )
+    is_close = np.fromiter(
+        (e.event_type == "close" for e in events), dtype=np.bool_, count=n
+    )
+    ws = window_start.timestamp()
+    we = window_end.timestamp()
+
+    open_idx = np.flatnonzero(is_open[:-1] & is_close[1:])
+    starts = times[open_idx]
+    ends = times[open_idx + 1]
+    end_times: list[datetime | None] = [events[i + 1].event_time for i in open_idx]
+    if is_open[-1]:
+        open_idx = np.append(open_idx, n - 1)
+        starts = np.append(starts, times[-1])
+        ends = np.append(ends, we)
+        end_times.append(None)
+
+    keep = np.flatnonzero(np.minimum(ends, we) > np.maximum(starts, ws))
+    intervals: list[tuple[datetime, datetime]] = []
+    for k in keep:
+        start = events[open_idx[k]].event_time
+        end = end_times[k] or window_end
+        intervals.append(
+            (
+                start if starts[k] >= ws else window_start,
+                end if ends[k] <= we else window_end,
+            )
+        )
+    return intervals
+
+
 def _collect_active_specs(
-    specs: List[DBActivitySpecWithTags],
+    specs: Sequence[DBActivitySpecWithTags],
     window_start: datetime,
     window_end: datetime,
 ) -> list[tuple[DBActivitySpecWithTags, list[tuple[datetime, datetime]]]]:
@@ -74,87 +112,97 @@ def _collect_active_specs(
         intervals = _activity_intervals_within_window(spec, window_start, window_end)
         if intervals:
             active.append((spec, intervals))
+    # Order by first interval start; the stable sort keeps input order for ties
+    active.sort(key=lambda pair: pair[1][0][0])
     return active
 
 
-def _select_top_tags(
-    active_specs: list[tuple[DBActivitySpecWithTags, list[tuple[datetime, datetime]]]],
-) -> list[_TagInfo]:
-    freq: dict[int, _TagInfo] = {}
-    for spec, _ in active_specs:
-        seen = set()
-        for tag in spec.tags:
-            # Avoid double-counting a tag repeated (shouldn't happen but safe)
-            if tag.id in seen:
-                continue
-            seen.add(tag.id)
-            if tag.id not in freq:
-                freq[tag.id] = _TagInfo(id=tag.id, name=tag.name, count=0)
-            freq[tag.id].count += 1
-    # Order by frequency desc then name
-    ordered = sorted(freq.values(), key=lambda t: (-t.count, t.name.lower()))
-    return ordered[:MAX_TAGS]
+def _build_transition_matrix(
+    ordered_tag_ids: list[list[int]],
+    top_tag_ids: list[int],
+) -> np.ndarray:
+    """Counts tag transitions between consecutive specs.
 
+    ``ordered_tag_ids`` holds each active spec's tag ids, ordered by the
+    start of the spec's first interval.
+    """
+    index = {tag_id: i for i, tag_id in enumerate(top_tag_ids)}
+    size = len(top_tag_ids)
+    matrix = np.zeros((size, size), dtype=np.int32)
+    if not top_tag_ids or len(ordered_tag_ids) < 2:
+        return matrix
 
-def _build_transition_matrix(
-    active_specs: list[tuple[DBActivitySpecWithTags, list[tuple[datetime, datetime]]]],
-    top_tags: list[_TagInfo],
-):
-    if not top_tags:
-        return [], []
-    index = {t.id: i for i, t in enumerate(top_tags)}
-    size = len(top_tags)
-    matrix = [[0 for _ in range(size)] for _ in range(size)]
-
-    # Sort specs by first event time (start)
-    indexed_specs = [
-        (idx, spec, intervals) for idx, (spec, intervals) in enumerate(active_specs)
-    ]
-    ordered_specs = sorted(
-        indexed_specs,
-        key=lambda item: (
-            item[2][0][0],
-            item[0],
-        ),
-    )
-    if len(ordered_specs) < 2:
-        return matrix, top_tags
+    def tag_indices(tag_ids: list[int]) -> np.ndarray:
+        return np.fromiter(
+            (index[tag_id] for tag_id in tag_ids if tag_id in index), dtype=np.int64
+        )
 
-    prev_spec = ordered_specs[0][1]
-    for _, cur_spec, _ in ordered_specs[1:]:
-        prev_tag_ids = [t.id for t in prev_spec.tags if t.id in index]
-        cur_tag_ids = [t.id for t in cur_spec.tags if t.id in index]
-        if prev_tag_ids and cur_tag_ids:
-            for a in prev_tag_ids:
-                for b in cur_tag_ids:
-                    matrix[index[a]][index[b]] += 1
-        prev_spec = cur_spec
-    return matrix, top_tags
+    # Each step's current indices become the next step's previous ones
+    prev_idx = tag_indices(ordered_tag_ids[0])
+    for tag_ids in ordered_tag_ids[1:]:
+        cur_idx = tag_indices(tag_ids)
+        if prev_idx.size and cur_idx.size:
+            # Tag ids are unique per spec, so each cell is hit at most once
+            matrix[np.ix_(prev_idx, cur_idx)] += 1
+        prev_idx = cur_idx
+    return matrix
 
 
 def build_tag_transition_payload(
-    specs: List[DBActivitySpecWithTags],
+    specs: Sequence[DBActivitySpecWithTags],
     *,
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
 ):
     active_specs = _collect_active_specs(specs, start_time_user_tz, end_time_user_tz)
-    top_tags = _select_top_tags(active_specs)
-    matrix, tags = _build_transition_matrix(active_specs, top_tags)
-    total_unique_tags = {tag.id for spec, _ in active_specs for tag in spec.tags}
-    return json.dumps(
+
+    # One pass over the (start-ordered) active specs collects tag frequencies
+    # (whose keys are also the unique tag total) and each spec's tag ids for
+    # the transitions
+    count_by_id: dict[int, int] = {}
+    name_by_id: dict[int, str] = {}
+    ordered_tag_ids: list[list[int]] = []
+    for spec, _intervals in active_specs:
+        spec_tag_ids: list[int] = []
+        for tag in spec.tags:
+            # Avoid double-counting a tag repeated (shouldn't happen but safe)
+            if tag.id in spec_tag_ids:
+                continue
+            spec_tag_ids.append(tag.id)
+            if tag.id in count_by_id:
+                count_by_id[tag.id] += 1
+            else:
+                count_by_id[tag.id] = 1
+                name_by_id[tag.id] = tag.name
+        ordered_tag_ids.append(spec_tag_ids)
+
+    # Order by frequency desc then name; only the top MAX_TAGS are kept, so a
+    # bounded heap avoids sorting every tag
+    top_tags = heapq.nsmallest(
+        MAX_TAGS,
+        count_by_id.items(),
+        key=lambda kv: (-kv[1], name_by_id[kv[0]].lower()),
+    )
+    matrix = _build_transition_matrix(
+        ordered_tag_ids, [tag_id for tag_id, _ in top_tags]
+    )
+
+    return utils.json_dumps(
         {
-            "tags": [{"id": t.id, "name": t.name, "count": t.count} for t in tags],
+            "tags": [
+                {"id": tag_id, "name": name_by_id[tag_id], "count": count}
+                for tag_id, count in top_tags
+            ],
             "matrix": matrix,
-            "total_tag_count": len(total_unique_tags),
-            "start_date": utils.datetime_to_iso_8601(start_time_user_tz),
-            "end_date": utils.datetime_to_iso_8601(end_time_user_tz),
+            "total_tag_count": len(count_by_id),
+            "start_date": iso_8601(start_time_user_tz),
+            "end_date": iso_8601(end_time_user_tz),
         }
     )
 
 
 def create_tag_transition_chord_body(
-    specs: List[DBActivitySpecWithTags],
+    specs: Sequence[DBActivitySpecWithTags],
     *,
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
@@ -179,12 +227,12 @@ def create_tag_transition_chord_body(
             "lg:max-w-[800px] xl:max-w-[900px] 2xl:max-w-[1000px] min-w-[320px] min-h-[320px] "
         ),
         x_init="window.initTagTransitionChordFromJson($el.dataset.tagchord)",
-        **{"data-tagchord": payload},
+        **{"data-tagchord": utils.escape_attr_json(payload)},
     )
 
 
 def create_tag_transition_chord_container(
-    specs: List[DBActivitySpecWithTags],
+    specs: Sequence[DBActivitySpecWithTags],
     *,
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
@@ -202,9 +250,7 @@ def create_tag_transition_chord_container(
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#tag_transition_chord_chart",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": (
-                "JSON.stringify({reference_date: reference_date, view_mode: view_mode, offset: offset, selected_tag_ids: JSON.stringify(selected_tag_ids)})"
-            ),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[
         # Script depends only on global d3
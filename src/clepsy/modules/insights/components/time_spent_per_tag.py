@@ -1,19 +1,20 @@
 from __future__ import annotations
 
 from datetime import datetime
-import json
+from typing import Sequence
 
 from htpy import div, script
 
 from clepsy import utils
 from clepsy.entities import DBActivitySpecWithTags
 from clepsy.modules.activities.json_serializers import (
-    db_activity_spec_with_tags_to_json_serializable,
+    dumps_payload_with_specs,
 )
+from clepsy.modules.insights.components.common import INSIGHTS_HX_VALS, iso_8601
 
 
 def build_insights_payload(
-    activity_specs: list[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: datetime | None,
@@ -27,31 +28,26 @@ def build_insights_payload(
         int((end_time_user_tz - start_time_user_tz).total_seconds()),
     )
 
-    return json.dumps(
+    return dumps_payload_with_specs(
+        activity_specs,
         {
-            "activity_specs": [
-                db_activity_spec_with_tags_to_json_serializable(s)
-                for s in activity_specs
-            ],
-            "start_date": utils.datetime_to_iso_8601(start_time_user_tz),
-            "end_date": utils.datetime_to_iso_8601(end_time_user_tz),
-            "last_aggregation_end_time": utils.datetime_to_iso_8601(
-                last_aggregation_end_time_user_tz
-            )
+            "start_date": iso_8601(start_time_user_tz),
+            "end_date": iso_8601(end_time_user_tz),
+            "last_aggregation_end_time": iso_8601(last_aggregation_end_time_user_tz)
             if last_aggregation_end_time_user_tz
             else None,
-            "current_time": utils.datetime_to_iso_8601(current_time_user_tz),
+            "current_time": iso_8601(current_time_user_tz),
             "metadata": {
                 "activity_count": len(activity_specs),
                 "tag_count": len(unique_tag_ids),
                 "window_seconds": total_window_seconds,
             },
-        }
+        },
     )
 
 
 def create_time_spent_per_tag_body(
-    activity_specs: list[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: datetime | None,
@@ -70,12 +66,12 @@ def create_time_spent_per_tag_body(
         # Allow vertical expansion; smaller min-height on mobile.
         class_="relative w-full h-auto min-h-[280px] sm:min-h-[320px] overflow-x-hidden overflow-y-visible",
         x_init="window.initInsightsTimeSpentPerTagFromJson($el.dataset.insights)",
-        **{"data-insights": payload},
+        **{"data-insights": utils.escape_attr_json(payload)},
     )
 
 
 def create_time_spent_per_tag_container(
-    activity_specs: list[DBActivitySpecWithTags],
+    activity_specs: Sequence[DBActivitySpecWithTags],
     start_time_user_tz: datetime,
     end_time_user_tz: datetime,
     last_aggregation_end_time_user_tz: datetime | None,
@@ -101,11 +97,7 @@ def create_time_spent_per_tag_container(
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#time-spent-per-tag",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": (
-                "JSON.stringify({reference_date: reference_date, "
-                "view_mode: view_mode, offset: offset, "
-                "selected_tag_ids: JSON.stringify(selected_tag_ids)})"
-            ),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[
         script(src="/static/custom_scripts/utils.js"),
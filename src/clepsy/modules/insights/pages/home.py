@@ -1,16 +1,13 @@
-from datetime import datetime, timezone
-import json
-from zoneinfo import ZoneInfo
+import asyncio
+from datetime import datetime
+from functools import lru_cache
 
 from htpy import Element, div, form, script
+from markupsafe import Markup
 
 from clepsy import utils
 from clepsy.db.db import get_db_connection
-from clepsy.db.queries import (
-    select_last_aggregation,
-    select_specs_with_tags_in_time_range,
-    select_tags,
-)
+from clepsy.db.queries import select_tags
 from clepsy.entities import DBTag, UserSettings, ViewMode, get_view_mode_label
 from clepsy.frontend.components import (
     create_multiselect,
@@ -18,6 +15,7 @@ from clepsy.frontend.components import (
     create_standard_content,
     create_time_nav_group,
 )
+from clepsy.modules.insights.components.common import INSIGHTS_HX_VALS
 from clepsy.modules.insights.components.focus_sessions import (
     create_focus_sessions_section,
 )
@@ -33,14 +31,43 @@ from clepsy.modules.insights.components.tag_transition_chord import (
 from clepsy.modules.insights.components.time_spent_per_tag import (
     create_time_spent_per_tag_container,
 )
+from clepsy.modules.insights.service import load_insights_window
+
+
+_X_DATA_TEMPLATE = utils.compile_template(
+    """{
+            reference_date: '[[$reference_date]]',
+            view_mode: '[[$view_mode]]',
+            selected_tag_ids: [[$selected_tag_ids_json]],
+            offset: [[$offset]],
+            dispatch_events() {
+                this.$dispatch('update_insights_diagrams');
+            },
+        }"""
+)
 
 
-async def _build_controls(
+def _build_controls(
     *,
     all_tags: list[DBTag],
     selected_tag_ids: list[int],
     selected_view_mode: ViewMode,
-) -> Element:
+) -> Markup:
+    # Tags change rarely, so the rendered controls are reused while the tag
+    # names and the selection stay the same
+    return _render_controls(
+        tuple((tag.id, tag.name) for tag in all_tags),
+        tuple(sorted(set(selected_tag_ids))),
+        selected_view_mode,
+    )
+
+
+@lru_cache(maxsize=32)
+def _render_controls(
+    tags: tuple[tuple[int, str], ...],
+    selected_tag_ids: tuple[int, ...],
+    selected_view_mode: ViewMode,
+) -> Markup:
     view_mode_selector = create_single_select(
         element_id="view-mode-selector",
         name="view_mode",
@@ -53,8 +80,8 @@ async def _build_controls(
         },
     )
 
-    label_to_val = {"No Tags": str(-1), **{tag.name: str(tag.id) for tag in all_tags}}
-    selected_labels = [str(tag.name) for tag in all_tags if tag.id in selected_tag_ids]
+    label_to_val = {"No Tags": str(-1), **{name: str(tag_id) for tag_id, name in tags}}
+    selected_labels = [str(name) for tag_id, name in tags if tag_id in selected_tag_ids]
     if -1 in selected_tag_ids:
         selected_labels.append("No Tags")
 
@@ -74,7 +101,7 @@ async def _build_controls(
     time_nav_group = create_time_nav_group()
 
     # Updated layout to align with styling in graphs_and_controls (minus Add Activity button)
-    return div(
+    controls = div(
         class_="bg-card border border-border rounded-lg shadow-sm mb-6 overflow-y-visible"
     )[
         div(
@@ -92,82 +119,84 @@ async def _build_controls(
             )[time_nav_group,],
         ],
     ]
+    return Markup(str(controls))
 
 
 async def create_insights_page(user_settings: UserSettings) -> Element:
-    user_tz = ZoneInfo(user_settings.timezone)
+    user_tz = utils.get_zoneinfo(user_settings.timezone)
     current_time_user_tz = datetime.now(user_tz)
     start_of_day_user_tz = utils.datetime_to_start_of_day(current_time_user_tz)
 
     selected_view_mode = ViewMode.DAILY
     offset = 0
 
-    # Fetch data needed for initial render
-    async def get_initial(conn):
-        all_tags = await select_tags(conn)
-        selected_tag_ids = [tag.id for tag in all_tags] + [-1]
-        start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-            reference_date=start_of_day_user_tz,
-            view_mode=selected_view_mode,
-            offset=offset,
-        )
-        specs, last_agg = (
-            await select_specs_with_tags_in_time_range(
-                conn,
-                start=start_user_tz.astimezone(timezone.utc),
-                end=end_user_tz.astimezone(timezone.utc),
-            ),
-            await select_last_aggregation(conn),
-        )
-        return all_tags, selected_tag_ids, start_user_tz, end_user_tz, specs, last_agg
+    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
+        reference_date=start_of_day_user_tz,
+        view_mode=selected_view_mode,
+        offset=offset,
+    )
 
-    async with get_db_connection(include_uuid_func=False) as conn:
-        (
-            all_tags,
-            selected_tag_ids,
-            start_user_tz,
-            end_user_tz,
-            specs,
-            last_agg,
-        ) = await get_initial(conn)
+    async def load_tags() -> list[DBTag]:
+        async with get_db_connection(include_uuid_func=False) as conn:
+            return await select_tags(conn)
+
+    # Tags and the chart window are read over separate connections so the
+    # two fetches overlap; every tag starts selected, so the window is loaded
+    # unfiltered through the same cached loader the chart refreshes use
+    all_tags, (specs, last_agg) = await asyncio.gather(
+        load_tags(),
+        load_insights_window(user_settings.timezone, start_user_tz, end_user_tz, []),
+    )
+    selected_tag_ids = [tag.id for tag in all_tags] + [-1]
+
+    # Every chart below reads the same specs; share one immutable sequence
+    specs = tuple(specs)
+    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
 
-    controls = await _build_controls(
+    controls = _build_controls(
         all_tags=all_tags,
         selected_tag_ids=selected_tag_ids,
         selected_view_mode=selected_view_mode,
     )
 
-    # Graph containers (one per graph)
-    time_spent_graph = create_time_spent_per_tag_container(
-        activity_specs=[s for s in specs],
+    # Graph containers (one per graph). The payload builders are CPU-bound, so
+    # run them on worker threads to keep the event loop serving other requests
+    shared_kwargs = dict(
+        activity_specs=specs,
         start_time_user_tz=start_user_tz,
         end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=(
-            last_agg.end_time.astimezone(user_tz) if last_agg else None
-        ),
+        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
         current_time_user_tz=current_time_user_tz,
     )
-
-    productivity_graph_body = create_productivity_time_slice_body(
-        activity_specs=[s for s in specs],
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=(
-            last_agg.end_time.astimezone(user_tz) if last_agg else None
+    (
+        time_spent_graph,
+        productivity_graph_body,
+        productivity_donut_body,
+        chord_graph_container,
+        focus_sessions_section,
+    ) = await asyncio.gather(
+        asyncio.to_thread(create_time_spent_per_tag_container, **shared_kwargs),
+        asyncio.to_thread(
+            create_productivity_time_slice_body,
+            **shared_kwargs,
+            view_mode=selected_view_mode,
         ),
-        current_time_user_tz=current_time_user_tz,
-        view_mode=selected_view_mode,
-    )
-
-    productivity_donut_body = create_productivity_donut_body(
-        activity_specs=[s for s in specs],
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=(
-            last_agg.end_time.astimezone(user_tz) if last_agg else None
+        asyncio.to_thread(
+            create_productivity_donut_body,
+            **shared_kwargs,
+            view_mode=selected_view_mode,
+        ),
+        asyncio.to_thread(
+            create_tag_transition_chord_container,
+            specs,
+            start_time_user_tz=start_user_tz,
+            end_time_user_tz=end_user_tz,
+        ),
+        asyncio.to_thread(
+            create_focus_sessions_section,
+            **shared_kwargs,
+            view_mode=selected_view_mode,
         ),
-        current_time_user_tz=current_time_user_tz,
-        view_mode=selected_view_mode,
     )
 
     productivity_graph_container = div(
@@ -178,9 +207,7 @@ async def create_insights_page(user_settings: UserSettings) -> Element:
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#productivity_time_slice_chart",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": (
-                "JSON.stringify({reference_date: reference_date, view_mode: view_mode, offset: offset, selected_tag_ids: JSON.stringify(selected_tag_ids)})"
-            ),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[productivity_graph_body]
 
@@ -192,28 +219,17 @@ async def create_insights_page(user_settings: UserSettings) -> Element:
             "hx-trigger": "update_insights_diagrams from:body",
             "hx-target": "#productivity_donut_chart",
             "hx-swap": "outerHTML",
-            "x-bind:hx-vals": (
-                "JSON.stringify({reference_date: reference_date, view_mode: view_mode, offset: offset, selected_tag_ids: JSON.stringify(selected_tag_ids)})"
-            ),
+            "x-bind:hx-vals": INSIGHTS_HX_VALS,
         },
     )[productivity_donut_body]
 
     # Alpine x-data and watchers to dispatch update_insights_diagrams
-    x_data = utils.substitute_template(
-        """{
-            reference_date: '[[$reference_date]]',
-            view_mode: '[[$view_mode]]',
-            selected_tag_ids: [[$selected_tag_ids_json]],
-            offset: [[$offset]],
-            dispatch_events() {
-                this.$dispatch('update_insights_diagrams');
-            },
-        }""",
+    x_data = _X_DATA_TEMPLATE(
         {
             "reference_date": utils.datetime_to_iso_8601(start_of_day_user_tz),
             "view_mode": selected_view_mode.value,
             "offset": offset,
-            "selected_tag_ids_json": json.dumps(selected_tag_ids),
+            "selected_tag_ids_json": utils.json_dumps(selected_tag_ids),
         },
     )
 
@@ -234,23 +250,6 @@ async def create_insights_page(user_settings: UserSettings) -> Element:
     #   * basis-[520px] & min-w-[520px] enforce larger minimum width (except on very narrow screens where they can overflow; w-full keeps them fluid).
     #   * grow allows them to stretch evenly when extra horizontal space < 3 columns.
     #   * On extremely narrow screens (<520px) the browser will still shrink below min-w via overflow rules; if this proves too rigid we can add responsive min-w breakpoints later.
-    chord_graph_container = create_tag_transition_chord_container(
-        [s for s in specs],
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-    )
-
-    focus_sessions_section = create_focus_sessions_section(
-        activity_specs=[s for s in specs],
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=(
-            last_agg.end_time.astimezone(user_tz) if last_agg else None
-        ),
-        current_time_user_tz=current_time_user_tz,
-        view_mode=selected_view_mode,
-    )
-
     graphs_grid = div(
         class_=(
             "flex flex-wrap justify-center gap-4 sm:gap-6 md:gap-7 xl:gap-8 w-full "
@@ -1,17 +1,15 @@
-from datetime import datetime, timezone as dt_timezone
-import json
-from zoneinfo import ZoneInfo
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+from typing import Any, Callable
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from aiocache import SimpleMemoryCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response
 
 from clepsy import utils
-from clepsy.db.db import get_db_connection
 from clepsy.db.deps import get_user_settings
-from clepsy.db.queries import (
-    select_last_aggregation,
-    select_specs_with_tags_in_time_range,
-)
 from clepsy.entities import DBActivitySpecWithTags, UserSettings, ViewMode
 from clepsy.frontend.components import create_base_page
 from clepsy.modules.insights.components.focus_sessions import (
@@ -31,12 +29,23 @@ from clepsy.modules.insights.components.tag_transition_chord import (
 from clepsy.modules.insights.components.time_spent_per_tag import (
     create_time_spent_per_tag_body,
 )
+from clepsy.modules.insights.service import (
+    insights_data_version,
+    load_insights_window,
+)
 
 from .pages.home import create_insights_page
 
 
 router = APIRouter(prefix="/insights")
 
+# Rendered chart bodies are keyed by their ETag, which follows the persisted
+# data revision, so an edit committed through any worker moves every worker
+# to new keys; the TTL only bounds how long unused windows hold memory.
+insights_body_ttl = 60  # seconds
+
+_insights_body_cache = SimpleMemoryCache()
+
 
 @router.get("/")
 async def insights_home(
@@ -44,8 +53,7 @@ async def insights_home(
     user_settings: UserSettings = Depends(get_user_settings),
 ) -> HTMLResponse:
     try:
-        async with get_db_connection(include_uuid_func=False) as _:
-            page_el = await create_insights_page(user_settings=user_settings)
+        page_el = await create_insights_page(user_settings=user_settings)
 
         if request.state.is_htmx:
             return HTMLResponse(page_el)
@@ -63,36 +71,26 @@ async def insights_home(
         raise HTTPException(status_code=500, detail="Internal server error") from e
 
 
-def filter_activities_by_tags(
-    activities: list[DBActivitySpecWithTags], selected_tag_ids: list[int]
-) -> list[DBActivitySpecWithTags]:
-    if not selected_tag_ids:
-        return activities
-    no_tag_selected = -1 in selected_tag_ids
-    filtered = []
-    for spec in activities:
-        has_match = any(tag.id in selected_tag_ids for tag in spec.tags)
-        if has_match or (no_tag_selected and not spec.tags):
-            filtered.append(spec)
-    return filtered
+@dataclass(frozen=True)
+class InsightsContext:
+    specs_user_tz: list[DBActivitySpecWithTags]
+    start_time_user_tz: datetime
+    end_time_user_tz: datetime
+    last_aggregation_end_time_user_tz: datetime | None
+    current_time_user_tz: datetime
+    view_mode: ViewMode
+    etag: str
 
 
-@router.get("/update-time-spent-per-tag")
-async def update_time_spent_per_tag(
+async def get_insights_context(
     offset: int,
     reference_date: str,
-    selected_tag_ids: str,
     view_mode: ViewMode,
+    selected_tag_ids: list[int] = Query([]),
     user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    # Parse incoming values
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
-
-    user_tz = ZoneInfo(user_settings.timezone)
+) -> InsightsContext:
+    """Parses the shared hx-vals and loads the window every chart refresh needs."""
+    user_tz = utils.get_zoneinfo(user_settings.timezone)
     # reference_date is an ISO string without tz; interpret it as user_tz
     parsed_ref = datetime.fromisoformat(reference_date)
     if parsed_ref.tzinfo is None:
@@ -104,300 +102,204 @@ async def update_time_spent_per_tag(
         view_mode=view_mode,
     )
 
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        # Convert to user TZ
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        # Filter by tags
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-        last_agg = await select_last_aggregation(conn)
-
-    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
+    specs_user_tz, last_agg, data_revision = await load_insights_window(
+        user_settings.timezone, start_user_tz, end_user_tz, selected_tag_ids
+    )
 
-    body = create_time_spent_per_tag_body(
-        activity_specs=specs_user_tz,
+    return InsightsContext(
+        specs_user_tz=specs_user_tz,
         start_time_user_tz=start_user_tz,
         end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
+        last_aggregation_end_time_user_tz=(
+            last_agg.end_time.astimezone(user_tz) if last_agg else None
+        ),
         current_time_user_tz=datetime.now(user_tz),
+        view_mode=view_mode,
+        etag=_insights_etag(
+            user_settings.timezone,
+            start_user_tz,
+            end_user_tz,
+            selected_tag_ids,
+            view_mode,
+            last_agg.end_time if last_agg else None,
+            data_revision,
+        ),
     )
-    return HTMLResponse(body)
 
 
-@router.get("/update-productivity-time-slice")
-async def update_productivity_time_slice(
-    offset: int,
-    reference_date: str,
-    selected_tag_ids: str,
+def _insights_etag(
+    user_timezone: str,
+    start_user_tz: datetime,
+    end_user_tz: datetime,
+    selected_tag_ids: list[int],
     view_mode: ViewMode,
-    user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
-
-    user_tz = ZoneInfo(user_settings.timezone)
-    parsed_ref = datetime.fromisoformat(reference_date)
-    if parsed_ref.tzinfo is None:
-        parsed_ref = parsed_ref.replace(tzinfo=user_tz)
-
-    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=parsed_ref,
-        offset=offset,
-        view_mode=view_mode,
+    last_aggregation_end_time: datetime | None,
+    data_revision: int,
+) -> str:
+    """Validator for a chart body: it only changes with the window, the tag
+    selection, a new aggregation or an edit."""
+    source = "|".join(
+        [
+            user_timezone,
+            start_user_tz.isoformat(),
+            end_user_tz.isoformat(),
+            ",".join(str(tag_id) for tag_id in sorted(set(selected_tag_ids))),
+            view_mode.value,
+            last_aggregation_end_time.isoformat()
+            if last_aggregation_end_time
+            else "none",
+            insights_data_version(data_revision),
+        ]
     )
+    return f'"{hashlib.blake2b(source.encode(), digest_size=16).hexdigest()}"'
 
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-        last_agg = await select_last_aggregation(conn)
-
-    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
 
-    body = create_productivity_time_slice_body(
-        activity_specs=specs_user_tz,
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
-        current_time_user_tz=datetime.now(user_tz),
-        view_mode=view_mode,
-    )
-    return HTMLResponse(body)
+async def _render_insights_body(
+    request: Request,
+    ctx: InsightsContext,
+    build: Callable[..., Any],
+    **kwargs: Any,
+) -> Response:
+    """Renders a chart body, or answers 304 when the browser's copy is current.
+
+    ``no-cache`` makes the browser revalidate every refresh. The ETag follows
+    the persisted data revision, so an edit committed through any worker
+    changes it on all of them, while unchanged windows cost a revision read,
+    a cached window load and a 304.
+    """
+    headers = {"ETag": ctx.etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if ctx.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    # The ETag already pins everything the body depends on, so it doubles as
+    # the key for the rendered bytes
+    cache_key = f"{request.url.path}|{ctx.etag}"
+    content = await _insights_body_cache.get(cache_key)
+    if content is None:
+        # Building the payload and htpy tree is CPU-bound; keep it off the loop
+        content = await asyncio.to_thread(lambda: str(build(**kwargs)).encode())
+        await _insights_body_cache.set(cache_key, content, ttl=insights_body_ttl)
+    return HTMLResponse(content, headers=headers)
 
 
-@router.get("/update-productivity-donut")
-async def update_productivity_donut(
-    offset: int,
-    reference_date: str,
-    selected_tag_ids: str,
-    view_mode: ViewMode,
-    user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
+@router.get("/update-time-spent-per-tag")
+async def update_time_spent_per_tag(
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_time_spent_per_tag_body,
+        activity_specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
+        last_aggregation_end_time_user_tz=ctx.last_aggregation_end_time_user_tz,
+        current_time_user_tz=ctx.current_time_user_tz,
+    )
 
-    user_tz = ZoneInfo(user_settings.timezone)
-    parsed_ref = datetime.fromisoformat(reference_date)
-    if parsed_ref.tzinfo is None:
-        parsed_ref = parsed_ref.replace(tzinfo=user_tz)
 
-    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=parsed_ref,
-        offset=offset,
-        view_mode=view_mode,
+@router.get("/update-productivity-time-slice")
+async def update_productivity_time_slice(
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_productivity_time_slice_body,
+        activity_specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
+        last_aggregation_end_time_user_tz=ctx.last_aggregation_end_time_user_tz,
+        current_time_user_tz=ctx.current_time_user_tz,
+        view_mode=ctx.view_mode,
     )
 
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-        last_agg = await select_last_aggregation(conn)
 
-    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
-
-    body = create_productivity_donut_body(
-        activity_specs=specs_user_tz,
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
-        current_time_user_tz=datetime.now(user_tz),
-        view_mode=view_mode,
+@router.get("/update-productivity-donut")
+async def update_productivity_donut(
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_productivity_donut_body,
+        activity_specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
+        last_aggregation_end_time_user_tz=ctx.last_aggregation_end_time_user_tz,
+        current_time_user_tz=ctx.current_time_user_tz,
+        view_mode=ctx.view_mode,
     )
-    return HTMLResponse(body)
 
 
 @router.get("/update-focus-sessions-calendar")
 async def update_focus_sessions_calendar(
-    offset: int,
-    reference_date: str,
-    selected_tag_ids: str,
-    view_mode: ViewMode,
-    user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
-    user_tz = ZoneInfo(user_settings.timezone)
-    parsed_ref = datetime.fromisoformat(reference_date)
-    if parsed_ref.tzinfo is None:
-        parsed_ref = parsed_ref.replace(tzinfo=user_tz)
-    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=parsed_ref, offset=offset, view_mode=view_mode
-    )
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-        last_agg = await select_last_aggregation(conn)
-    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
-    body = create_focus_sessions_calendar_body(
-        activity_specs=specs_user_tz,
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
-        current_time_user_tz=datetime.now(user_tz),
-        view_mode=view_mode,
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_focus_sessions_calendar_body,
+        activity_specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
+        last_aggregation_end_time_user_tz=ctx.last_aggregation_end_time_user_tz,
+        current_time_user_tz=ctx.current_time_user_tz,
+        view_mode=ctx.view_mode,
     )
-    return HTMLResponse(body)
 
 
 @router.get("/update-focus-sessions-histogram")
 async def update_focus_sessions_histogram(
-    offset: int,
-    reference_date: str,
-    selected_tag_ids: str,
-    view_mode: ViewMode,
-    user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
-    user_tz = ZoneInfo(user_settings.timezone)
-    parsed_ref = datetime.fromisoformat(reference_date)
-    if parsed_ref.tzinfo is None:
-        parsed_ref = parsed_ref.replace(tzinfo=user_tz)
-    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=parsed_ref, offset=offset, view_mode=view_mode
-    )
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-        last_agg = await select_last_aggregation(conn)
-    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
-    body = create_focus_sessions_histogram_body(
-        activity_specs=specs_user_tz,
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
-        current_time_user_tz=datetime.now(user_tz),
-        view_mode=view_mode,
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_focus_sessions_histogram_body,
+        activity_specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
+        last_aggregation_end_time_user_tz=ctx.last_aggregation_end_time_user_tz,
+        current_time_user_tz=ctx.current_time_user_tz,
+        view_mode=ctx.view_mode,
     )
-    return HTMLResponse(body)
 
 
 @router.get("/update-focus-sessions-stats")
 async def update_focus_sessions_stats(
-    offset: int,
-    reference_date: str,
-    selected_tag_ids: str,
-    view_mode: ViewMode,
-    user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
-    user_tz = ZoneInfo(user_settings.timezone)
-    parsed_ref = datetime.fromisoformat(reference_date)
-    if parsed_ref.tzinfo is None:
-        parsed_ref = parsed_ref.replace(tzinfo=user_tz)
-    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=parsed_ref, offset=offset, view_mode=view_mode
-    )
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-        last_agg = await select_last_aggregation(conn)
-    last_agg_end_user_tz = last_agg.end_time.astimezone(user_tz) if last_agg else None
-    body = create_focus_sessions_stats_body(
-        activity_specs=specs_user_tz,
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
-        last_aggregation_end_time_user_tz=last_agg_end_user_tz,
-        current_time_user_tz=datetime.now(user_tz),
-        view_mode=view_mode,
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_focus_sessions_stats_body,
+        activity_specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
+        last_aggregation_end_time_user_tz=ctx.last_aggregation_end_time_user_tz,
+        current_time_user_tz=ctx.current_time_user_tz,
+        view_mode=ctx.view_mode,
     )
-    return HTMLResponse(body)
 
 
 @router.get("/update-tag-transition-chord")
 async def update_tag_transition_chord(
-    offset: int,
-    reference_date: str,
-    selected_tag_ids: str,
-    view_mode: ViewMode,
-    user_settings: UserSettings = Depends(get_user_settings),
-) -> HTMLResponse:
-    try:
-        parsed_ids_raw = json.loads(selected_tag_ids) if selected_tag_ids else []
-    except json.JSONDecodeError:
-        parsed_ids_raw = []
-    parsed_selected_tag_ids = [int(x) for x in parsed_ids_raw]
-
-    user_tz = ZoneInfo(user_settings.timezone)
-    parsed_ref = datetime.fromisoformat(reference_date)
-    if parsed_ref.tzinfo is None:
-        parsed_ref = parsed_ref.replace(tzinfo=user_tz)
-
-    start_user_tz, end_user_tz = utils.calculate_date_based_on_view_mode(
-        reference_date=parsed_ref,
-        offset=offset,
-        view_mode=view_mode,
-    )
-
-    async with get_db_connection(include_uuid_func=False) as conn:
-        specs = await select_specs_with_tags_in_time_range(
-            conn=conn,
-            start=start_user_tz.astimezone(dt_timezone.utc),
-            end=end_user_tz.astimezone(dt_timezone.utc),
-        )
-        specs_user_tz = [s.to_tz(user_tz) for s in specs]
-        specs_user_tz = filter_activities_by_tags(
-            specs_user_tz, parsed_selected_tag_ids
-        )
-
-    body = create_tag_transition_chord_body(
-        specs=specs_user_tz,
-        start_time_user_tz=start_user_tz,
-        end_time_user_tz=end_user_tz,
+    request: Request,
+    ctx: InsightsContext = Depends(get_insights_context),
+) -> Response:
+    return await _render_insights_body(
+        request,
+        ctx,
+        create_tag_transition_chord_body,
+        specs=ctx.specs_user_tz,
+        start_time_user_tz=ctx.start_time_user_tz,
+        end_time_user_tz=ctx.end_time_user_tz,
     )
-    return HTMLResponse(body)
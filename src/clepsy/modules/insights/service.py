@@ -0,0 +1,130 @@
+"""Data loading shared by the insights chart refresh endpoints."""
+
+import asyncio
+from datetime import datetime, timezone
+import hashlib
+from pathlib import Path
+
+from aiocache import SimpleMemoryCache
+import aiosqlite
+
+import clepsy
+from clepsy import utils
+from clepsy.db.db import get_db_connection
+from clepsy.db.queries import (
+    select_data_revision,
+    select_last_aggregation,
+    select_specs_with_tags_in_time_range,
+)
+from clepsy.entities import DBActivitySpecWithTags, DBAggregation
+
+
+# Every chart refreshes off the same 'update_insights_diagrams' event, so the
+# burst of requests for one window only needs to share a single load.
+insights_window_ttl = 2  # seconds
+
+_insights_window_cache = SimpleMemoryCache()
+# Serializes misses so the burst waits for the first load instead of racing it
+_insights_window_lock = asyncio.Lock()
+
+
+async def _load_specs_and_last_agg(
+    conn: aiosqlite.Connection,
+    start_user_tz: datetime,
+    end_user_tz: datetime,
+    selected_tag_ids: list[int],
+) -> tuple[list[DBActivitySpecWithTags], DBAggregation | None]:
+    """Fetches the window's tag-filtered specs and the last aggregation in one go.
+
+    The tag selection (where -1 stands for untagged activities) is applied
+    in SQL; an empty selection means no filtering.
+
+    aiosqlite runs both on the connection's worker thread; gathering them
+    queues the second query straight behind the first instead of waiting for
+    the event loop to resume the handler in between.
+    """
+    specs, last_agg = await asyncio.gather(
+        select_specs_with_tags_in_time_range(
+            conn=conn,
+            start=start_user_tz.astimezone(timezone.utc),
+            end=end_user_tz.astimezone(timezone.utc),
+            tag_ids=(
+                [tag_id for tag_id in selected_tag_ids if tag_id != -1]
+                if selected_tag_ids
+                else None
+            ),
+            include_untagged=-1 in selected_tag_ids,
+        ),
+        select_last_aggregation(conn),
+    )
+    return specs, last_agg
+
+
+def _source_fingerprint() -> str:
+    """Hashes the package sources, so validators change with a deploy.
+
+    Every worker of one deploy computes the same value, unlike a per-process
+    token, so a browser's ETag stays valid whichever worker answers.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    package_dir = Path(clepsy.__file__).parent
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+_source_token = _source_fingerprint()
+
+
+def insights_data_version(data_revision: int) -> str:
+    """Identifies the code and the data behind a response, for HTTP validators.
+
+    ``data_revision`` is the persisted revision bumped by every edit and
+    sessionization run, so it is shared by all workers.
+    """
+    return f"{_source_token}.{data_revision}"
+
+
+async def load_insights_window(
+    user_timezone: str,
+    start_user_tz: datetime,
+    end_user_tz: datetime,
+    selected_tag_ids: list[int],
+) -> tuple[list[DBActivitySpecWithTags], DBAggregation | None, int]:
+    """Loads the tag-filtered, user-timezone specs and the last aggregation.
+
+    Also returns the data revision they were loaded at. Results are cached
+    in-process for ``insights_window_ttl`` seconds, keyed by the timezone, the
+    window, the tag selection and that revision, so an edit committed by any
+    worker misses the cache everywhere.
+    """
+    async with get_db_connection(include_uuid_func=False) as conn:
+        # Read before the data, so a cached entry is never older than its key
+        data_revision = await select_data_revision(conn)
+        cache_key = "|".join(
+            [
+                user_timezone,
+                start_user_tz.isoformat(),
+                end_user_tz.isoformat(),
+                ",".join(str(tag_id) for tag_id in sorted(set(selected_tag_ids))),
+                str(data_revision),
+            ]
+        )
+
+        cached = await _insights_window_cache.get(cache_key)
+        if cached is not None:
+            return (*cached, data_revision)
+
+        async with _insights_window_lock:
+            cached = await _insights_window_cache.get(cache_key)
+            if cached is not None:
+                return (*cached, data_revision)
+
+            specs, last_agg = await _load_specs_and_last_agg(
+                conn, start_user_tz, end_user_tz, selected_tag_ids
+            )
+            specs_user_tz = utils.bulk_to_tz(specs, utils.get_zoneinfo(user_timezone))
+            await _insights_window_cache.set(
+                cache_key, (specs_user_tz, last_agg), ttl=insights_window_ttl
+            )
+    return specs_user_tz, last_agg, data_revision
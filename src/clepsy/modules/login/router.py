@@ -1,3 +1,7 @@
+import asyncio
+import hmac
+import os
+
 from fastapi import APIRouter, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from loguru import logger
@@ -14,9 +18,13 @@ from clepsy.modules.login.page import (
 
 router = APIRouter()
 
+# Verified against when no credentials are stored, so that path costs the same
+# argon2 work as a real password check
+DUMMY_HASH = hash_password(os.urandom(32).hex())
+
 
 @router.get("/login")
-async def login_page(request: Request):
+def login_page(request: Request):
     is_authenticated = request.state.authenticated
 
     if is_authenticated:
@@ -48,15 +56,25 @@ async def login_user(password: str = Form(...)) -> Response:  # Use base Respons
         async with get_db_connection(include_uuid_func=False) as conn:
             # Always verify against user_auth
             auth_row = await select_user_auth(conn)
+            password_to_check_hash = (
+                auth_row["password_hash"] if auth_row else DUMMY_HASH
+            )
+
+            # Run the hash check on every path and merge the outcome before
+            # branching, so response timing doesn't reveal which check failed
+            password_ok = await asyncio.to_thread(
+                verify_password, stored_hash=password_to_check_hash, password=password
+            )
+            login_ok = hmac.compare_digest(
+                b"\x01" if password_ok and auth_row else b"\x00", b"\x01"
+            )
+
             if not auth_row:
                 logger.error("Auth not initialized (user_auth empty)")
                 raise RuntimeError("Authentication not initialized")
-            password_to_check_hash = auth_row["password_hash"]
 
             # Validate password
-            if not verify_password(
-                stored_hash=password_to_check_hash, password=password
-            ):
+            if not login_ok:
                 logger.warning("Invalid login attempt")
                 # Return login form with error message
                 error_form = create_login_page(error_message="Invalid password")
@@ -65,10 +83,10 @@ async def login_user(password: str = Form(...)) -> Response:  # Use base Respons
             # Login successful
             logger.info("Successful login!")
 
-        if maybe_rehash(password_to_check_hash):
-            logger.info("Rehashing password with updated parameters")
-            new_hash = hash_password(password)
-            async with get_db_connection(include_uuid_func=False) as conn:
+            # Reuse the open connection; the update commits when it closes
+            if maybe_rehash(password_to_check_hash):
+                logger.info("Rehashing password with updated parameters")
+                new_hash = await asyncio.to_thread(hash_password, password)
                 await update_user_password(conn=conn, password_hash=new_hash)
 
         # Create JWT token
@@ -101,7 +119,7 @@ async def login_user(password: str = Form(...)) -> Response:  # Use base Respons
 
 
 @router.get("/logout")
-async def logout_user(_: Request):
+def logout_user(_: Request):
     logger.info("User is logging out.")
     response = RedirectResponse(url="/s/login", status_code=303)
     response.delete_cookie(key="Authorization", samesite="lax")
@@ -1,94 +1,206 @@
 from dataclasses import dataclass
 from functools import lru_cache
+import re
 from time import perf_counter
-from typing import Any, List
+from typing import Any
 
 from loguru import logger
 import numpy as np
+import paddle
 from paddleocr import PaddleOCR
 from PIL import Image
 
+from clepsy import utils
 
-@dataclass
-class BoxText:
-    text: str
-    conf: float
-    xmin: float
-    xmax: float
-    ymin: float
-    ymax: float
-    ymid: float
-    height: float
+
+@dataclass(frozen=True)
+class OcrBoxes:
+    """Recognized text boxes stored column-wise, one array entry per box."""
+
+    text: list[str]
+    conf: np.ndarray
+    xmin: np.ndarray
+    xmax: np.ndarray
+    ymin: np.ndarray
+    ymax: np.ndarray
+    ymid: np.ndarray
+    height: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+_EMPTY_COLUMN = np.empty(0, dtype=float)
+
+EMPTY_OCR_BOXES = OcrBoxes(
+    text=[],
+    conf=_EMPTY_COLUMN,
+    xmin=_EMPTY_COLUMN,
+    xmax=_EMPTY_COLUMN,
+    ymin=_EMPTY_COLUMN,
+    ymax=_EMPTY_COLUMN,
+    ymid=_EMPTY_COLUMN,
+    height=_EMPTY_COLUMN,
+)
 
 
 @lru_cache(maxsize=1)
 def get_ocr(lang_code: str = "en", ocr_version: str = "PP-OCRv5") -> PaddleOCR:
+    # Cached, so the device context is created once and reused by every predict
+    if paddle.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0:
+        device_kwargs: dict[str, Any] = {"device": "gpu:0"}
+    else:
+        device_kwargs = {
+            "device": "cpu",
+            "enable_mkldnn": True,  # force CPU accel
+            "cpu_threads": 4,  # tune 2–8
+        }
+    logger.info("Loading PaddleOCR on {device}", device=device_kwargs["device"])
     return PaddleOCR(
         lang=lang_code,
         ocr_version=ocr_version,
         use_textline_orientation=False,
         use_doc_unwarping=False,
-        enable_mkldnn=True,  # force CPU accel
-        cpu_threads=4,  # tune 2–8
         rec_batch_num=32,  # avoid version-default ambiguity
+        **device_kwargs,
     )
 
 
-def parse_results(ocr_result: list[Any]) -> List[BoxText]:
+def parse_results(ocr_result: list[Any]) -> OcrBoxes:
     if not ocr_result:
-        return []
-    items = []
+        return EMPTY_OCR_BOXES
+    texts: list[str] = []
+    scores: list[float] = []
+    point_arrays: list[np.ndarray] = []
     for result in ocr_result:
-        texts: list[str] = result.get("rec_texts", []) or []
-        scores: list[float] = result.get("rec_scores", []) or []
+        result_texts: list[str] = result.get("rec_texts", []) or []
+        result_scores: list[float] = result.get("rec_scores", []) or []
 
         boxes = result.get("rec_polys")
-        if isinstance(boxes, np.ndarray):
-            boxes = boxes.tolist()
+        if boxes is None or len(boxes) == 0:
+            boxes = result.get("rec_boxes")
+            if boxes is None:
+                boxes = []
 
-        if not boxes:
-            rb = result.get("rec_boxes")
-            if isinstance(rb, np.ndarray):
-                rb = rb.tolist()
-            if rb is None:
-                rb = []
-            boxes = rb
+        n = min(len(result_texts), len(result_scores), len(boxes))
+        if n == 0:
+            continue
 
-        for txt, conf, box in zip(texts, scores, boxes):
-            box_arr = np.asarray(box, dtype=float).reshape(-1, 2)
-            xs, ys = box_arr[:, 0], box_arr[:, 1]
-            xmin, xmax = float(xs.min()), float(xs.max())
-            ymin, ymax = float(ys.min()), float(ys.max())
-            ymid = (ymin + ymax) / 2.0
-            height = ymax - ymin
+        texts.extend(result_texts[:n])
+        scores.extend(result_scores[:n])
+        # rec_boxes rows (xmin, ymin, xmax, ymax) reshape to two corner points;
+        # reduce to extents here so results with different point counts stack
+        points = np.asarray(boxes[:n], dtype=float).reshape(n, -1, 2)
+        point_arrays.append(
+            np.stack(
+                [
+                    points[:, :, 0].min(axis=1),
+                    points[:, :, 0].max(axis=1),
+                    points[:, :, 1].min(axis=1),
+                    points[:, :, 1].max(axis=1),
+                ],
+                axis=1,
+            )
+        )
 
-            items.append(BoxText(txt, conf, xmin, xmax, ymin, ymax, ymid, height))
+    if not texts:
+        return EMPTY_OCR_BOXES
 
-    return items
+    extents = np.concatenate(point_arrays)
+    xmin, xmax, ymin, ymax = extents.T
+    return OcrBoxes(
+        text=texts,
+        conf=np.asarray(scores, dtype=float),
+        xmin=xmin,
+        xmax=xmax,
+        ymin=ymin,
+        ymax=ymax,
+        ymid=(ymin + ymax) / 2.0,
+        height=ymax - ymin,
+    )
 
 
-def group_lines(items: List[BoxText]) -> List[List[BoxText]]:
-    if not items:
+def group_lines(boxes: OcrBoxes) -> list[np.ndarray]:
+    """Groups boxes into lines; returns each line's box indices, left to right."""
+    if not len(boxes):
         return []
-    items = sorted(items, key=lambda it: it.ymid)
-    heights = sorted(it.height for it in items if it.height > 0)
-    med_h = heights[len(heights) // 2] if heights else 16.0
+    order = np.argsort(boxes.ymid, kind="stable")
+    heights = boxes.height[boxes.height > 0]
+    mid = heights.size // 2
+    # Selection is enough for the (upper) median; no need to sort every height
+    med_h = float(np.partition(heights, mid)[mid]) if heights.size else 16.0
     y_thresh = max(8.0, 0.6 * med_h)
 
-    lines: List[List[BoxText]] = []
-    current: List[BoxText] = [items[0]]
-    current_y = items[0].ymid
-
-    for it in items[1:]:
-        if abs(it.ymid - current_y) <= y_thresh:
-            current.append(it)
-            current_y = (current_y * (len(current) - 1) + it.ymid) / len(current)
+    # The running line centre depends on every box merged so far, so the scan
+    # stays sequential, but over plain floats rather than objects
+    ymids = boxes.ymid[order].tolist()
+    line_starts: list[int] = [0]
+    current_y = ymids[0]
+    current_len = 1
+    for i, ymid in enumerate(ymids[1:], start=1):
+        if abs(ymid - current_y) <= y_thresh:
+            current_len += 1
+            current_y = (current_y * (current_len - 1) + ymid) / current_len
         else:
-            lines.append(sorted(current, key=lambda x: x.xmin))
-            current = [it]
-            current_y = it.ymid
-    lines.append(sorted(current, key=lambda x: x.xmin))
-    return lines
+            line_starts.append(i)
+            current_y = ymid
+            current_len = 1
+
+    lines = np.split(order, line_starts[1:])
+    return [line[np.argsort(boxes.xmin[line], kind="stable")] for line in lines]
+
+
+# Detector/recognizer settings shared by the single-image and batched paths
+_PREDICT_KWARGS: dict[str, Any] = {
+    "use_doc_orientation_classify": False,
+    "use_doc_unwarping": False,
+    "use_textline_orientation": False,
+    "text_det_limit_type": "max",
+    "text_det_limit_side_len": 960,  # doc default; try 736 after verifying recall
+    "text_det_thresh": 0.3,
+    "text_det_box_thresh": 0.60,
+    "text_det_unclip_ratio": 1.6,
+    "text_rec_score_thresh": 0.80,
+    "return_word_box": False,
+}
+
+
+# Drops the space the word join leaves before trailing punctuation
+_PUNCT_FIX_RE = re.compile(r" ([,.:;])")
+
+
+def boxes_to_text(boxes: OcrBoxes) -> str:
+    if not len(boxes):
+        return ""
+
+    lines = group_lines(boxes)
+    # Sized up front and filled by index; the line count is already known
+    text_lines: list[str] = [""] * len(lines)
+    for n, line in enumerate(lines):
+        words = [
+            word for word in (boxes.text[i].strip() for i in line.tolist()) if word
+        ]
+        text_lines[n] = _PUNCT_FIX_RE.sub(r"\1", " ".join(words))
+    return "\n".join(text_lines)
+
+
+# Bound on the long side of what reaches PaddleOCR. The detector downsizes to
+# text_det_limit_side_len on its own, but recognition crops from the input, so
+# this stays well above that to keep small UI text legible.
+OCR_MAX_SIDE = 1920
+
+
+def _prepare_image(image: Image.Image) -> Image.Image:
+    # convert() always returns a new image, so shrinking it in place leaves the
+    # caller's screenshot untouched
+    image_rgb = image.convert("RGB")
+    return utils.resize_image_with_thumbnail(
+        image=image_rgb,
+        target_width=OCR_MAX_SIDE,
+        target_height=OCR_MAX_SIDE,
+        resample_filter=Image.Resampling.BILINEAR,
+        inplace=True,
+    )
 
 
 def ocr_ui_text(
@@ -98,24 +210,12 @@ def ocr_ui_text(
 ) -> str:
     ocr = get_ocr(lang_code, ocr_version)
 
-    image_rgb = image.convert("RGB")
+    image_rgb = _prepare_image(image)
 
     numpydata = np.array(image_rgb)
     try:
         start = perf_counter()
-        result = ocr.predict(
-            input=numpydata,
-            use_doc_orientation_classify=False,
-            use_doc_unwarping=False,
-            use_textline_orientation=False,
-            text_det_limit_type="max",
-            text_det_limit_side_len=960,  # doc default; try 736 after verifying recall
-            text_det_thresh=0.3,
-            text_det_box_thresh=0.60,
-            text_det_unclip_ratio=1.6,
-            text_rec_score_thresh=0.80,
-            return_word_box=False,
-        )
+        result = ocr.predict(input=numpydata, **_PREDICT_KWARGS)
         duration = perf_counter() - start
         logger.info(
             "PaddleOCR predict completed in {duration:.2f}s for {width}x{height} image",
@@ -131,20 +231,35 @@ def ocr_ui_text(
             error=exc,
         )
         return ""
-    items = parse_results(result)
-    if not items:
-        return ""
+    return boxes_to_text(parse_results(result))
 
-    lines = group_lines(items)
-    text_lines: list[str] = []
-    for line in lines:
-        words = [w.text.strip() for w in line if w.text.strip()]
-        joined = " ".join(words)
-        joined = (
-            joined.replace(" ,", ",")
-            .replace(" .", ".")
-            .replace(" :", ":")
-            .replace(" ;", ";")
+
+def ocr_ui_text_batch(
+    images: list[Image.Image],
+    lang_code: str = "en",
+    ocr_version: str = "PP-OCRv5",
+) -> list[str]:
+    """OCR several images in one ``predict`` call; one text per input image."""
+    if not images:
+        return []
+
+    ocr = get_ocr(lang_code, ocr_version)
+
+    numpydata = [np.array(_prepare_image(image)) for image in images]
+    try:
+        start = perf_counter()
+        results = ocr.predict(input=numpydata, **_PREDICT_KWARGS)
+        duration = perf_counter() - start
+        logger.info(
+            "PaddleOCR batch predict completed in {duration:.2f}s for {n} images",
+            duration=duration,
+            n=len(images),
         )
-        text_lines.append(joined)
-    return "\n".join(text_lines)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception(
+            "PaddleOCR batch prediction failed for {n} images: {error}",
+            n=len(images),
+            error=exc,
+        )
+        return [""] * len(images)
+    return [boxes_to_text(parse_results([result])) for result in results]
@@ -0,0 +1,73 @@
+"""Single GLiNER process shared by every worker process on the host.
+
+Run with ``python -m clepsy.modules.pii.inference_server``; in the compose
+files it is its own ``gliner-server`` service, restarted by Docker if it
+exits. Workers reach it over the Unix socket in
+``config.gliner_server_address`` instead of each loading their own copy of
+the model.
+"""
+
+from multiprocessing.connection import Connection, Listener
+from pathlib import Path
+import threading
+
+from gliner import GLiNER
+from loguru import logger
+
+from clepsy.config import config
+from clepsy.modules.pii.pii import get_gliner_model, gliner_server_authkey
+
+
+def _handle(conn: Connection, model: GLiNER, lock: threading.Lock) -> None:
+    """Answers one request with ``("ok", entities)`` or ``("error", message)``."""
+    with conn:
+        try:
+            texts, labels, threshold = conn.recv()
+        except EOFError:
+            logger.debug("GLiNER client disconnected before sending a request")
+            return
+        try:
+            # One forward pass at a time; the model already uses every core
+            with lock:
+                entities = model.batch_predict_entities(
+                    texts, labels=labels, threshold=threshold
+                )
+            reply = ("ok", entities)
+        except Exception as e:
+            logger.exception("GLiNER inference request failed")
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except (BrokenPipeError, ConnectionError):
+            logger.debug("GLiNER client disconnected before the reply")
+
+
+def serve(address: str) -> None:
+    # Bind before loading the model so early clients queue instead of falling
+    # back to an in-process copy
+    Path(address).unlink(missing_ok=True)
+    listener = Listener(address, family="AF_UNIX", authkey=gliner_server_authkey())
+    model = get_gliner_model(
+        model_name=config.gliner_pii_model,
+        cache_dir=config.gliner_cache_dir,
+        precision=config.gliner_precision,
+    )
+    lock = threading.Lock()
+    logger.info("GLiNER inference server listening on {address}", address=address)
+
+    with listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                logger.exception("Rejected GLiNER inference connection")
+                continue
+            threading.Thread(
+                target=_handle, args=(conn, model, lock), daemon=True
+            ).start()
+
+
+if __name__ == "__main__":
+    if not config.gliner_server_address:
+        raise SystemExit("GLINER_SERVER_ADDRESS is not set")
+    serve(config.gliner_server_address)
@@ -1,19 +1,32 @@
 from functools import lru_cache
+from multiprocessing.connection import Client
 from pathlib import Path
 from time import perf_counter
 from typing import Callable
 
 from gliner import GLiNER
 from loguru import logger
+import torch
 
 from clepsy.config import config
 
 
 @lru_cache
-def get_gliner_model(model_name: str, cache_dir: Path) -> GLiNER:
+def get_gliner_model(
+    model_name: str, cache_dir: Path, precision: str = "fp32"
+) -> GLiNER:
     logger.info(f"Loading GLiNER model '{model_name}'")
     model = GLiNER.from_pretrained(model_name, cache_dir=cache_dir)
-    logger.info("GLiNER model loaded")
+    if precision == "fp16":
+        if torch.cuda.is_available():
+            model = model.to("cuda").half()
+        else:
+            logger.warning("GLiNER fp16 requested without CUDA; keeping fp32")
+    elif precision == "int8":
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    logger.info("GLiNER model loaded ({precision})", precision=precision)
     return model
 
 
@@ -21,6 +34,60 @@ def redact_template(entity_type: str) -> str:
     return f"<REDACTED:{entity_type.upper()}>"
 
 
+def gliner_server_authkey() -> bytes:
+    """Shared secret the inference server and its clients authenticate with."""
+    return config.master_key.get_secret_value()
+
+
+class GlinerServerError(RuntimeError):
+    """Inference failed inside the shared GLiNER process."""
+
+
+def _predict_remote(
+    address: str, texts: list[str], entity_types: list[str], threshold: float
+) -> list[list[dict]]:
+    with Client(address, family="AF_UNIX", authkey=gliner_server_authkey()) as conn:
+        conn.send((texts, entity_types, threshold))
+        if not conn.poll(config.gliner_server_timeout_seconds):
+            raise TimeoutError(
+                f"no reply within {config.gliner_server_timeout_seconds}s"
+            )
+        status, payload = conn.recv()
+    if status != "ok":
+        raise GlinerServerError(payload)
+    return payload
+
+
+def _predict_entities(
+    texts: list[str],
+    model: GLiNER | None,
+    entity_types: list[str],
+    threshold: float,
+) -> list[list[dict]]:
+    if model is None and config.gliner_server_address:
+        try:
+            return _predict_remote(
+                config.gliner_server_address, texts, entity_types, threshold
+            )
+        except (FileNotFoundError, ConnectionError, EOFError, TimeoutError) as e:
+            # The server being down or stuck shouldn't stop redaction;
+            # inference errors it reports are raised as GlinerServerError
+            logger.warning(
+                "GLiNER server at {address} unavailable ({error}); "
+                "using an in-process model",
+                address=config.gliner_server_address,
+                error=repr(e),
+            )
+
+    if model is None:
+        model = get_gliner_model(
+            model_name=config.gliner_pii_model,
+            cache_dir=config.gliner_cache_dir,
+            precision=config.gliner_precision,
+        )
+    return model.batch_predict_entities(texts, labels=entity_types, threshold=threshold)
+
+
 def anonymize_text(
     text: str,
     model: GLiNER | None = None,
@@ -28,16 +95,11 @@ def anonymize_text(
     threshold: float = 0.3,
     redact_func: Callable[[str], str] = redact_template,
 ) -> str:
-    if model is None:
-        model = get_gliner_model(
-            model_name=config.gliner_pii_model,
-            cache_dir=config.gliner_cache_dir,
-        )
     if entity_types is None:
         entity_types = []
 
     start = perf_counter()
-    entities = model.predict_entities(text, labels=entity_types, threshold=threshold)
+    [entities] = _predict_entities([text], model, entity_types, threshold)
     duration = perf_counter() - start
     logger.info(
         "GLiNER inference completed in {duration:.2f}s for {length} characters",
@@ -45,17 +107,53 @@ def anonymize_text(
         length=len(text),
     )
 
-    # Sort by position to replace from end to start
-    entities.sort(key=lambda x: x["start"], reverse=True)
+    return _redact_entities(text, entities, redact_func)
 
-    anonymized = text
+
+def anonymize_texts(
+    texts: list[str],
+    model: GLiNER | None = None,
+    entity_types: list[str] | None = None,
+    threshold: float = 0.3,
+    redact_func: Callable[[str], str] = redact_template,
+) -> list[str]:
+    """Batched ``anonymize_text``: one GLiNER forward pass for all texts."""
+    if not texts:
+        return []
+    if entity_types is None:
+        entity_types = []
+
+    start = perf_counter()
+    batch_entities = _predict_entities(texts, model, entity_types, threshold)
+    duration = perf_counter() - start
+    logger.info(
+        "GLiNER batch inference completed in {duration:.2f}s for {n} texts",
+        duration=duration,
+        n=len(texts),
+    )
+
+    return [
+        _redact_entities(text, entities, redact_func)
+        for text, entities in zip(texts, batch_entities)
+    ]
+
+
+def _redact_entities(
+    text: str, entities: list[dict], redact_func: Callable[[str], str]
+) -> str:
+    # Collect the kept slices and placeholders in order and join once, rather
+    # than rebuilding the whole string for every entity
+    entities.sort(key=lambda x: x["start"])
+
+    parts: list[str] = []
+    cursor = 0
     for entity in entities:
-        placeholder = redact_func(entity["label"])
-        anonymized = (
-            anonymized[: entity["start"]] + placeholder + anonymized[entity["end"] :]
-        )
+        parts.append(text[cursor : entity["start"]])
+        parts.append(redact_func(entity["label"]))
+        cursor = max(cursor, entity["end"])
+    parts.append(text[cursor:])
 
-    return anonymized
+    return "".join(parts)
 
 
 DEFAULT_PII_ENTITY_TYPES = [
@@ -1,10 +1,12 @@
 import asyncio
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Optional
 
 from loguru import logger
+import numpy as np
 
 from baml_client import b
 from baml_client.type_builder import TypeBuilder
@@ -13,6 +15,7 @@ from clepsy import utils
 from clepsy.config import config
 from clepsy.db import get_db_connection
 from clepsy.db.queries import (
+    bump_data_revision,
     delete_candidate_session_to_activity_by_activity_ids,
     delete_candidate_sessions_by_ids,
     delete_candidate_sessions_without_activities,
@@ -40,7 +43,6 @@ from clepsy.entities import (
     SessionizationRun,
     SessionSpec,
     SessionToActivity,
-    Tag,
     TimeSpan,
 )
 from clepsy.llm import create_client_registry
@@ -51,31 +53,29 @@ async def detect_sessions(
     preexisting_sessions: list[CandidateSession],
     window_end: datetime,
     llm_config: LLMConfig,
+    assume_sorted: bool = False,
 ) -> list[CandidateSessionSpec]:
-    # Extract unique tags from all activity specs
-    all_tags: dict[int, Tag] = {}
-    for spec in specs_in_time_range:
-        for db_tag in spec.tags:
-            if db_tag.id not in all_tags:
-                all_tags[db_tag.id] = Tag(
-                    name=db_tag.name, description=db_tag.description
-                )
-
-    baml_tags = [
-        baml_types.Tag(name=tag.name, description=tag.description)
-        for tag in all_tags.values()
-    ]
-
+    # One pass over the specs collects the unique tags and builds the
+    # activities the LLM sees
+    all_tags: dict[int, baml_types.Tag] = {}
     baml_activities = []
 
     seen_names = defaultdict(lambda: 0)
 
-    sorted_specs_in_time_range = sorted(
-        specs_in_time_range, key=lambda spec: spec.start_time
+    sorted_specs_in_time_range = (
+        specs_in_time_range
+        if assume_sorted
+        else sorted(specs_in_time_range, key=lambda spec: spec.start_time)
     )
     llm_id_to_activity_id = {}
 
     for activity_spec in sorted_specs_in_time_range:
+        for db_tag in activity_spec.tags:
+            if db_tag.id not in all_tags:
+                all_tags[db_tag.id] = baml_types.Tag(
+                    name=db_tag.name, description=db_tag.description
+                )
+
         llm_id = utils.activity_name_to_id(activity_spec.activity.name)
         current_count = seen_names[llm_id]
 
@@ -100,6 +100,8 @@ async def detect_sessions(
             )
         )
 
+    baml_tags = list(all_tags.values())
+
     if preexisting_sessions:
         preexisting_sessions_baml = [
             baml_types.SessionIdentifier(session_id=x.llm_id, title=x.name)
@@ -166,12 +168,17 @@ async def propose_candidate_sessions_for_island(
     mapping_for_new_sessions = defaultdict(set)
     mappings_for_carry_over_sessions = defaultdict(set)
 
+    # Keyed on plain (name, llm_id) tuples so lookups hash a tuple rather than
+    # going through the pydantic model's __hash__
     carry_over_session_to_db = {
-        CandidateSession(name=spec.session.name, llm_id=spec.session.llm_id): spec
+        (spec.session.name, spec.session.llm_id): spec
         for spec in carry_over_session_specs
     }
 
-    overlap_sessions = list(carry_over_session_to_db.keys())
+    overlap_sessions = [
+        CandidateSession(name=name, llm_id=llm_id)
+        for name, llm_id in carry_over_session_to_db
+    ]
 
     for index, sub_array in enumerate(sub_arrays):
         is_last = index == len(sub_arrays) - 1
@@ -180,10 +187,14 @@ async def propose_candidate_sessions_for_island(
             preexisting_sessions=overlap_sessions,
             window_end=window_end,
             llm_config=llm_config,
+            # Islands are ordered by start time and the split keeps that order
+            assume_sorted=True,
         )
 
         for session_spec in candidate_session_specs:
-            if db_spec := carry_over_session_to_db.get(session_spec.session):
+            if db_spec := carry_over_session_to_db.get(
+                (session_spec.session.name, session_spec.session.llm_id)
+            ):
                 # Only add new mappings - existing ones are already in DB
                 new_mappings = [
                     x
@@ -253,108 +264,180 @@ def build_island_arrays(
         spans: list[TimeSpan] = spec.time_spans(horizon=island_end)
         if not spans:
             continue
-        s = spans[0].start_time
-        e = spans[-1].end_time
-        total = timedelta(0)
-        for ts in spans:
-            total += ts.duration
-        starts.append(s)
-        ends.append(e)
-        secs.append(float(total.total_seconds()))
+        starts.append(spans[0].start_time)
+        ends.append(spans[-1].end_time)
+        # Summed as timedeltas (exact) in the builtin sum's loop
+        secs.append(sum((ts.duration for ts in spans), timedelta(0)).total_seconds())
         ids.append(spec.activity_id)
     return {"starts": starts, "ends": ends, "secs": secs, "ids": ids}
 
 
-def pick_best_window_for_candidate(
-    starts: list[datetime],
-    ends: list[datetime],
-    secs: list[float],
-    ids: list[int],
-    candidate_ids: set[int],
-    min_activities: int,
-    min_purity: float,
-    min_length: timedelta,
-    max_gap: timedelta,
-) -> Optional[Interval]:
-    n = len(ids)
-    if n == 0:
-        return None
-    inc_secs: list[float] = [
-        secs[i] if ids[i] in candidate_ids else 0.0 for i in range(n)
-    ]
-    inc_flags: list[int] = [1 if ids[i] in candidate_ids else 0 for i in range(n)]
-    min_len_s: float = float(min_length.total_seconds())
-    max_gap_s: float = float(max_gap.total_seconds())
-
-    def internal_gap_ok(L: int, R: int) -> tuple[bool, int]:
-        prev_idx: Optional[int] = None
-        for i in range(L, R + 1):
-            if inc_flags[i] == 1:
-                if prev_idx is not None:
-                    gap_s = (starts[i] - ends[prev_idx]).total_seconds()
-                    if gap_s > max_gap_s:
-                        return False, prev_idx + 1
-                prev_idx = i
-        return True, L
-
-    best: Optional[Interval] = None
+_ONE_US = timedelta(microseconds=1)
+
+
+def _best_window(
+    starts_us,
+    ends_us,
+    cum_inc_us,
+    cum_inc_cnt,
+    inc_idx,
+    bad_pairs,
+    min_activities,
+    min_purity,
+    min_len_us,
+):
+    """Two-pointer scan; returns (L, R, purity, span_us), with L == -1 if none.
+
+    Runs over plain lists, where indexing and the C bisect functions are
+    cheaper than element access on NumPy arrays.
+    """
+    n = len(starts_us)
+    best_L = -1
+    best_R = -1
+    best_purity = 0.0
+    best_span_us = 0
     L = 0
-    sum_inc = 0.0
-    sum_inc_cnt = 0
 
     for R in range(n):
-        sum_inc += inc_secs[R]
-        sum_inc_cnt += inc_flags[R]
-
         while L <= R:
-            span_s = (ends[R] - starts[L]).total_seconds()
-            if span_s <= 0:
-                sum_inc -= inc_secs[L]
-                sum_inc_cnt -= inc_flags[L]
+            span_us = ends_us[R] - starts_us[L]
+            if span_us <= 0:
                 L += 1
                 continue
 
-            purity = min(sum_inc / span_s, 1.0)
+            purity = min((cum_inc_us[R + 1] - cum_inc_us[L]) / span_us, 1.0)
             if purity < min_purity:
-                sum_inc -= inc_secs[L]
-                sum_inc_cnt -= inc_flags[L]
                 L += 1
                 continue
 
-            ok, suggested_L = internal_gap_ok(L, R)
-            if not ok:
-                while L < suggested_L:
-                    sum_inc -= inc_secs[L]
-                    sum_inc_cnt -= inc_flags[L]
-                    L += 1
+            # Jump past the first too-long gap between included activities
+            lo = bisect_left(inc_idx, L)
+            hi = bisect_right(inc_idx, R)
+            j = bisect_left(bad_pairs, lo)
+            if j < len(bad_pairs) and bad_pairs[j] + 1 < hi:
+                L = inc_idx[bad_pairs[j]] + 1
                 continue
 
-            cand_cnt = sum_inc_cnt
-            if cand_cnt >= min_activities and span_s >= min_len_s:
-                chosen_ids: list[int] = [
-                    ids[i] for i in range(L, R + 1) if inc_flags[i] == 1
-                ]
-                candidate = Interval(
-                    name="",
-                    llm_id="",
-                    L=L,
-                    R=R,
-                    start=starts[L],
-                    end=ends[R],
-                    dur_s=span_s,
-                    purity=purity,
-                    chosen_ids=chosen_ids,
-                )
+            cand_cnt = cum_inc_cnt[R + 1] - cum_inc_cnt[L]
+            if cand_cnt >= min_activities and span_us >= min_len_us:
                 if (
-                    best is None
-                    or candidate.dur_s > best.dur_s
-                    or (
-                        candidate.dur_s == best.dur_s and candidate.purity > best.purity
-                    )
+                    best_L == -1
+                    or span_us > best_span_us
+                    or (span_us == best_span_us and purity > best_purity)
                 ):
-                    best = candidate
+                    best_L = L
+                    best_R = R
+                    best_purity = purity
+                    best_span_us = span_us
             break  # keep L as far left as constraints allow for this R
-    return best
+    return best_L, best_R, best_purity, best_span_us
+
+
+@dataclass(frozen=True)
+class _IslandVectors:
+    """Island arrays as NumPy vectors, built once and shared by all candidates.
+
+    Times are int64 microseconds (offsets from the first start), which keeps
+    the comparisons exactly as timedelta arithmetic would without datetime
+    math in the scan.
+    """
+
+    starts_us: np.ndarray
+    ends_us: np.ndarray
+    secs_us: np.ndarray
+    ids: np.ndarray
+
+
+def _island_vectors(
+    starts: list[datetime], ends: list[datetime], secs: list[float], ids: list[int]
+) -> _IslandVectors:
+    n = len(starts)
+    ref = starts[0]
+    return _IslandVectors(
+        starts_us=np.fromiter(((s - ref) // _ONE_US for s in starts), np.int64, n),
+        ends_us=np.fromiter(((e - ref) // _ONE_US for e in ends), np.int64, n),
+        secs_us=np.round(np.asarray(secs, dtype=np.float64) * 1e6).astype(np.int64),
+        ids=np.asarray(ids, dtype=np.int64),
+    )
+
+
+def _candidate_mask(vectors: _IslandVectors, candidate_ids: set[int]) -> np.ndarray:
+    return np.isin(vectors.ids, np.fromiter(candidate_ids, dtype=np.int64))
+
+
+def _pick_best_window(
+    starts: list[datetime],
+    ends: list[datetime],
+    ids: list[int],
+    vectors: _IslandVectors,
+    inc_flags: np.ndarray,
+    min_activities: int,
+    min_purity: float,
+    min_length: timedelta,
+    max_gap: timedelta,
+) -> Optional[Interval]:
+    starts_us, ends_us = vectors.starts_us, vectors.ends_us
+    inc_us = np.where(inc_flags, vectors.secs_us, 0)
+
+    # Prefix sums with a leading zero: the total over [L..R] is cum[R + 1] - cum[L]
+    cum_inc_us = np.concatenate(([0], np.cumsum(inc_us))).astype(np.int64)
+    cum_inc_cnt = np.concatenate(([0], np.cumsum(inc_flags))).astype(np.int64)
+
+    # Pair k joins included activities inc_idx[k] and inc_idx[k + 1]
+    inc_idx = np.flatnonzero(inc_flags)
+    pair_gaps_us = starts_us[inc_idx[1:]] - ends_us[inc_idx[:-1]]
+    bad_pairs = np.flatnonzero(pair_gaps_us > max_gap // _ONE_US)
+
+    kernel_inputs = (starts_us, ends_us, cum_inc_us, cum_inc_cnt, inc_idx, bad_pairs)
+    L, R, purity, span_us = _best_window(
+        *(arr.tolist() for arr in kernel_inputs),
+        min_activities,
+        min_purity,
+        min_length // _ONE_US,
+    )
+    if L == -1:
+        return None
+
+    lo = int(np.searchsorted(inc_idx, L, side="left"))
+    hi = int(np.searchsorted(inc_idx, R, side="right"))
+    return Interval(
+        name="",
+        llm_id="",
+        L=L,
+        R=R,
+        start=starts[L],
+        end=ends[R],
+        dur_s=int(span_us) / 1e6,
+        purity=float(purity),
+        chosen_ids=[ids[i] for i in inc_idx[lo:hi].tolist()],
+    )
+
+
+def pick_best_window_for_candidate(
+    starts: list[datetime],
+    ends: list[datetime],
+    secs: list[float],
+    ids: list[int],
+    candidate_ids: set[int],
+    min_activities: int,
+    min_purity: float,
+    min_length: timedelta,
+    max_gap: timedelta,
+) -> Optional[Interval]:
+    if not ids:
+        return None
+    vectors = _island_vectors(starts, ends, secs, ids)
+    return _pick_best_window(
+        starts,
+        ends,
+        ids,
+        vectors,
+        _candidate_mask(vectors, candidate_ids),
+        min_activities=min_activities,
+        min_purity=min_purity,
+        min_length=min_length,
+        max_gap=max_gap,
+    )
 
 
 def extract_windows_for_candidate(
@@ -367,38 +450,50 @@ def extract_windows_for_candidate(
     min_purity: float,
     min_length: timedelta,
     max_gap: timedelta,
+    vectors: _IslandVectors | None = None,
 ) -> list[Interval]:
-    """Extract all disjoint (by activity_id) valid windows for one candidate."""
+    """Extract all disjoint (by activity_id) valid windows for one candidate.
+
+    ``vectors`` takes the island's ``_island_vectors`` when the caller already
+    built them.
+    """
     windows: list[Interval] = []
+    if not ids:
+        return windows
     remaining_ids: set[int] = set(candidate_ids)
-    seen: set[tuple[int, ...]] = set()
+
+    # The time arrays are shared by every pass; only the inclusion mask shrinks
+    # as windows consume activities
+    if vectors is None:
+        vectors = _island_vectors(starts, ends, secs, ids)
+    inc_flags = _candidate_mask(vectors, remaining_ids)
 
     while remaining_ids:
-        iv = pick_best_window_for_candidate(
-            starts=starts,
-            ends=ends,
-            secs=secs,
-            ids=ids,
-            candidate_ids=remaining_ids,
+        # Too few activities left for any window to qualify
+        if np.count_nonzero(inc_flags) < min_activities:
+            break
+        iv = _pick_best_window(
+            starts,
+            ends,
+            ids,
+            vectors,
+            inc_flags,
             min_activities=min_activities,
             min_purity=min_purity,
             min_length=min_length,
             max_gap=max_gap,
         )
+        # chosen_ids only ever holds still-included activities, and those are
+        # cleared below, so every pass makes progress and no window repeats
         if not iv or not iv.chosen_ids:
             break
 
-        # ensure progress + dedupe
-        chosen_tuple = tuple(iv.chosen_ids)
-        if chosen_tuple in seen:
-            break
-        seen.add(chosen_tuple)
-
         windows.append(iv)
 
         # consume chosen ids so next pass can find another disjoint window (if any)
         for aid in iv.chosen_ids:
             remaining_ids.discard(aid)
+        inc_flags &= ~np.isin(vectors.ids, iv.chosen_ids)
 
     return windows
 
@@ -426,7 +521,9 @@ def validate_and_select_sessions(
     # Map activity_id -> duration (seconds)
     id2dur: dict[int, float] = {ids[i]: secs[i] for i in range(len(ids))}
 
-    # 1) Build all valid windows (intervals) from candidates
+    # 1) Build all valid windows (intervals) from candidates; the island's
+    # vectors are built once and shared by every candidate
+    vectors = _island_vectors(starts, ends, secs, ids) if ids else None
     intervals: list[Interval] = []
     for c in candidate_specs:
         cand_set: set[int] = set(c.activity_ids)
@@ -440,6 +537,7 @@ def validate_and_select_sessions(
             min_purity=min_purity,
             min_length=min_length,
             max_gap=max_gap,
+            vectors=vectors,
         )
         for iv in ivs:
             iv.name = c.session.name
@@ -450,30 +548,25 @@ def validate_and_select_sessions(
         return []
 
     # 2) Greedy maximum coverage under "no shared activity_id"
+    # Intervals that share an activity with a chosen one are dropped, so a
+    # survivor's marginal gain is always its full duration. Gains never change,
+    # and one stable sort by (gain, purity, dur) replaces re-scanning for the
+    # max each step; ties keep candidate order just as max() did.
     covered: set[int] = set()
     chosen: list[Interval] = []
 
-    def marginal_gain(iv: Interval) -> float:
-        return sum(id2dur[aid] for aid in iv.chosen_ids if aid not in covered)
-
-    # Recompute marginal gains each step until no positive gain
-    remaining: list[Interval] = intervals[:]
-    while remaining:
-        # pick best by marginal gain, tie-break by purity then longer dur
-        best_iv = max(remaining, key=lambda x: (marginal_gain(x), x.purity, x.dur_s))
-        gain = marginal_gain(best_iv)
-        if gain <= 0:
+    gains = {id(iv): sum(id2dur[aid] for aid in iv.chosen_ids) for iv in intervals}
+    ranked = sorted(
+        intervals, key=lambda x: (gains[id(x)], x.purity, x.dur_s), reverse=True
+    )
+    for iv in ranked:
+        if gains[id(iv)] <= 0:
             break
+        if not covered.isdisjoint(iv.chosen_ids):
+            continue
         # accept
-        chosen.append(best_iv)
-        for aid in best_iv.chosen_ids:
-            covered.add(aid)
-        # drop best_iv and any interval that now conflicts (shares an activity)
-        remaining = [
-            iv
-            for iv in remaining
-            if iv is not best_iv and not any(a in covered for a in iv.chosen_ids)
-        ]
+        chosen.append(iv)
+        covered.update(iv.chosen_ids)
 
     # 3) Build output specs
     result: list[SessionSpec] = [
@@ -487,7 +580,7 @@ def validate_and_select_sessions(
 
 @dataclass
 class Island:
-    activity_specs: list[DBActivitySpecWithTags]
+    activity_specs: list[DBActivitySpecWithTags]  # ordered by start time
     left_connected: bool
     right_connected: bool
 
@@ -506,15 +599,6 @@ def extract_valid_islands(
 ) -> list[Island]:
     """Partition coverage into left tail, middle islands, and right tail."""
 
-    def is_land_valid(specs: list[DBActivitySpecWithTags]) -> bool:
-        if len(specs) < min_activities_per_session:
-            return False
-
-        start_time = min(spec.start_time for spec in specs)
-        end_time = max(spec.end_time(window_end) for spec in specs)
-
-        return (end_time - start_time) >= min_session_length
-
     assert specs_in_time_range, "specs_in_time_range must not be empty"
     specs_in_time_range = sorted(specs_in_time_range, key=lambda spec: spec.start_time)
     full_activity_spans = [x.total_span(window_end) for x in specs_in_time_range]
@@ -536,6 +620,28 @@ def extract_valid_islands(
     else:
         segments = [specs_in_time_range]
 
+    # Middle islands are checked on int64 microsecond offsets: the specs are
+    # sorted, so a segment starts at its first spec and ends at the max of its
+    # end offsets, taken for every segment in one reduceat
+    segment_starts = np.asarray([0, *island_split_indexes], dtype=np.intp)
+    ref = full_activity_spans[0].start_time
+    n_specs = len(full_activity_spans)
+    starts_us = np.fromiter(
+        ((span.start_time - ref) // _ONE_US for span in full_activity_spans),
+        np.int64,
+        n_specs,
+    )
+    ends_us = np.fromiter(
+        ((span.end_time - ref) // _ONE_US for span in full_activity_spans),
+        np.int64,
+        n_specs,
+    )
+    segment_sizes = np.diff(np.append(segment_starts, n_specs))
+    segment_valid = (segment_sizes >= min_activities_per_session) & (
+        np.maximum.reduceat(ends_us, segment_starts) - starts_us[segment_starts]
+        >= min_session_length // _ONE_US
+    )
+
     islands = []
 
     first_segment = segments[0]
@@ -566,8 +672,8 @@ def extract_valid_islands(
             )
         )
 
-        for middle_segment in segments[1:-1]:
-            if is_land_valid(middle_segment):
+        for middle_segment, is_valid in zip(segments[1:-1], segment_valid[1:-1]):
+            if is_valid:
                 islands.append(
                     Island(
                         activity_specs=middle_segment,
@@ -629,15 +735,18 @@ def finalize_right_connected_island(
     """
     F = overlap_start
 
-    # Build quick index: activity_id -> (start, end) with horizon for OPEN
-    id2start: dict[int, datetime] = {}
-    id2end: dict[int, datetime] = {}
+    # Build quick index: activity_id -> row of start/end offsets from F, as
+    # int64 microseconds (exact, like the datetimes), with horizon for OPEN
+    id_to_idx: dict[int, int] = {}
+    start_offsets: list[int] = []
+    end_offsets: list[int] = []
     prefix_island: list[DBActivitySpecWithTags] = []
     for spec in island:
         s = spec.start_time
         e = spec.end_time(horizon=island_end)  # your API
-        id2start[spec.activity_id] = s
-        id2end[spec.activity_id] = e
+        id_to_idx[spec.activity_id] = len(start_offsets)
+        start_offsets.append((s - F) // _ONE_US)
+        end_offsets.append((e - F) // _ONE_US)
         if e <= F:
             prefix_island.append(spec)
 
@@ -648,6 +757,10 @@ def finalize_right_connected_island(
             activity_ids_to_delete_from_candidate_sessions=[],
         )
 
+    starts_arr = np.asarray(start_offsets, dtype=np.int64)
+    ends_arr = np.asarray(end_offsets, dtype=np.int64)
+    max_gap_us = max_gap // _ONE_US
+
     # Partition candidates and keep only SAFE left chunks
     # Also track which activity IDs come from DBCandidateSessionSpec (for deletion tracking)
     safe_left_candidates: list[CandidateSessionSpec] = []
@@ -656,51 +769,37 @@ def finalize_right_connected_island(
     for c in candidate_specs:
         is_db_candidate = isinstance(c, DBCandidateSessionSpec)
 
-        L_ids: list[int] = []
-        R_ids: list[int] = []
-        for aid in c.activity_ids:
-            s = id2start.get(aid)
-            e = id2end.get(aid)
-            if s is None or e is None:
-                continue
-            if e <= F:
-                L_ids.append(aid)
-            elif s > F:
-                R_ids.append(aid)
-            else:
-                # An activity straddling F (shouldn't happen with atom spans), treat as right
-                R_ids.append(aid)
+        present_ids = [aid for aid in c.activity_ids if aid in id_to_idx]
+        idx = np.fromiter(
+            (id_to_idx[aid] for aid in present_ids),
+            dtype=np.intp,
+            count=len(present_ids),
+        )
+        ids_arr = np.asarray(present_ids, dtype=np.int64)
+        # end <= F is left; everything else, including an activity straddling F
+        # (shouldn't happen with atom spans), is treated as right
+        is_left = ends_arr[idx] <= 0
+        L_idx, R_idx = idx[is_left], idx[~is_left]
 
-        if not L_ids:
+        if not L_idx.size:
             # nothing to finalize on the left for this candidate
             continue
 
-        if not R_ids:
-            # wholly left -> safe
-            safe_left_candidates.append(
-                CandidateSessionSpec(
-                    session=CandidateSession(
-                        name=c.session.name, llm_id=c.session.llm_id
-                    ),
-                    activity_ids=sorted(L_ids, key=lambda x: id2start[x]),
-                )
-            )
-            # Track DB candidate activity IDs that are being finalized
-            if is_db_candidate:
-                db_candidate_safe_left_activity_ids.update(L_ids)
-            continue
-
-        # crosses F -> apply no-bridge test
-        e_left = max(id2end[aid] for aid in L_ids)
-        s_right = min(id2start[aid] for aid in R_ids)
-        if (s_right - e_left) > max_gap:
-            # cannot legally bridge across F -> safe to finalize left chunk now
+        # wholly left -> safe; crosses F -> apply no-bridge test, since a gap
+        # over max_gap cannot legally bridge across F
+        if (
+            not R_idx.size
+            or (starts_arr[R_idx].min() - ends_arr[L_idx].max()) > max_gap_us
+        ):
+            L_ids: list[int] = ids_arr[is_left][
+                np.argsort(starts_arr[L_idx], kind="stable")
+            ].tolist()
             safe_left_candidates.append(
                 CandidateSessionSpec(
                     session=CandidateSession(
                         name=c.session.name, llm_id=c.session.llm_id
                     ),
-                    activity_ids=sorted(L_ids, key=lambda x: id2start[x]),
+                    activity_ids=L_ids,
                 )
             )
             # Track DB candidate activity IDs that are being finalized
@@ -856,16 +955,17 @@ async def finalize_carry_over_sessions_and_save(
                 sessions=[spec.session for spec in sessions_to_create],
                 sessionization_run_id=sessionization_id,
             )
-            session_to_activities = []
-            for spec, sid in zip(sessions_to_create, session_ids):
-                for aid in spec.activity_ids:
-                    session_to_activities.append(
-                        SessionToActivity(session_id=sid, activity_id=aid)
-                    )
+            session_to_activities = [
+                SessionToActivity(session_id=sid, activity_id=aid)
+                for spec, sid in zip(sessions_to_create, session_ids)
+                for aid in spec.activity_ids
+            ]
             if session_to_activities:
                 await insert_session_to_activity(conn, mappings=session_to_activities)
 
         await delete_candidate_sessions_without_activities(conn)
+        # Session assignments are part of the cached diagram and insights data
+        await bump_data_revision(conn)
 
 
 async def deal_with_island(
@@ -1306,15 +1406,24 @@ async def run_sessionization():
                 )
             ]
 
-            first_island.activity_specs = list(
-                set(first_island.activity_specs) | set(overlap_specs)
+            first_island.activity_specs = sorted(
+                set(first_island.activity_specs) | set(overlap_specs),
+                key=lambda spec: spec.start_time,
             )
 
         else:
             overlap_related_session_specs = []
 
+        # Islands are independent until the results are written below, so their
+        # LLM round-trips overlap, bounded to keep the provider from being flooded
+        island_semaphore = asyncio.Semaphore(config.max_concurrent_llm_islands)
+
+        async def deal_with_island_bounded(**kwargs):
+            async with island_semaphore:
+                return await deal_with_island(**kwargs)
+
         first_island_task = asyncio.create_task(
-            deal_with_island(
+            deal_with_island_bounded(
                 island=first_island,
                 carry_over_candidate_session_specs=overlap_related_session_specs,
                 window_end=candidate_creation_interval_end,
@@ -1331,7 +1440,7 @@ async def run_sessionization():
         for island in islands:
             island_tasks.append(
                 asyncio.create_task(
-                    deal_with_island(
+                    deal_with_island_bounded(
                         island=island,
                         carry_over_candidate_session_specs=[],
                         window_end=candidate_creation_interval_end,
@@ -1493,4 +1602,7 @@ async def run_sessionization():
         # Step 6: Cleanup delete_candidate_sessions_without_activities
         await delete_candidate_sessions_without_activities(conn)
 
+        # Step 7: Let cached diagram and insights data pick up the sessions
+        await bump_data_revision(conn)
+
     logger.info("[sessionization-isolated] DEFERRED transaction committed successfully")
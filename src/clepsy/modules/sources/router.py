@@ -1,3 +1,4 @@
+import asyncio
 import base64
 from datetime import datetime, timezone as dt_timezone
 import hashlib
@@ -69,7 +70,7 @@ async def redeem_enrollment_code(body: SourcePairRequest) -> SourcePairResponse:
                         status_code=400, detail="Enrollment code expired"
                     )
 
-            if not verify_password(code_hash, body.code):
+            if not await asyncio.to_thread(verify_password, code_hash, body.code):
                 raise HTTPException(status_code=401, detail="Invalid enrollment code")
 
             # Generate device token: 32 random bytes -> urlsafe base64 string (no padding)
@@ -7,7 +7,7 @@ from loguru import logger
 from pydantic import BaseModel
 
 from clepsy.db.db import get_db_connection
-from clepsy.db.queries import bulk_upsert_tags, select_tags
+from clepsy.db.queries import bulk_upsert_tags, bump_data_revision, select_tags
 from clepsy.entities import DBTag, Tag
 from clepsy.frontend.components import create_button
 from clepsy.modules.user_settings.page import create_tags_page
@@ -150,6 +150,7 @@ async def update_tags(
         try:
             # Perform the bulk operation
             await bulk_upsert_tags(conn, tags_to_update, tags_to_insert, ids_to_delete)
+            await bump_data_revision(conn)
 
             # Explicitly commit the transaction
             await conn.commit()
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone as dt_timezone
 import json
 import secrets
@@ -134,7 +135,7 @@ async def get_add_source_modal() -> HTMLResponse:
     try:
         alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
         code = "".join(secrets.choice(alphabet) for _ in range(6))
-        code_hash = hash_password(code)
+        code_hash = await asyncio.to_thread(hash_password, code)
         expires_at = datetime.now(dt_timezone.utc) + config.source_enrollment_code_ttl
         async with get_db_connection() as conn:
             await deactivate_active_enrollment_codes(conn)
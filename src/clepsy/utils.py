@@ -1,6 +1,8 @@
 import base64
-from datetime import date as datetime_date, datetime, timedelta, timezone
+from datetime import date as datetime_date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
 import io
+import json
 import math
 import os
 import re
@@ -12,6 +14,7 @@ from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from baml_py import FunctionLog, Image as BamlImage
 from dateutil.relativedelta import relativedelta
 from loguru import logger
+from markupsafe import Markup
 from PIL import Image
 from unidecode import unidecode
 
@@ -21,6 +24,7 @@ from clepsy.entities import (
     ActivityEvent,
     ActivityEventType,
     CheckWithError,
+    DBActivitySpec,
     TimeSpan,
     ViewMode,
 )
@@ -28,6 +32,33 @@ from clepsy.human_readable_pw import generate_typable_password
 from clepsy.infra.valkey_client import get_connection
 
 
+def _json_default(obj):
+    # Datetimes as ISO 8601, NumPy arrays and scalars as plain Python values
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj) -> str:
+    """Serializes ``obj`` to a JSON string, encoding datetimes and NumPy values."""
+    return json.dumps(obj, default=_json_default)
+
+
+_HTML_ATTR_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+)
+
+
+def escape_attr_json(payload: str) -> Markup:
+    """Escapes a JSON payload once for a double-quoted HTML attribute.
+
+    The result is ``Markup`` so htpy emits it as-is instead of escaping again.
+    """
+    return Markup(payload.translate(_HTML_ATTR_ESCAPE_TABLE))
+
+
 def count_words(text: str) -> int:
     return len(re.findall(r"\b\w+\b", text))
 
@@ -342,6 +373,9 @@ def split_by_indices(seq: Sequence[T], indices: Sequence[int]) -> list[list[T]]:
     return result
 
 
+# Session detection formats the same durations and names again for every
+# overlapping sub-array it sends to the LLM
+@lru_cache(maxsize=4096)
 def human_delta(delta: timedelta) -> str:
     total_seconds = int(delta.total_seconds())
     if total_seconds < 0:
@@ -447,6 +481,7 @@ def txt(*args: str, join=" ") -> str:
     return join.join(args)
 
 
+@lru_cache(maxsize=4096)
 def activity_name_to_id(name: str) -> str:
     ascii_name: str = unidecode(name)
     normalized_name: str = ascii_name.lower().replace(" ", "_")
@@ -628,7 +663,28 @@ def custom_template(pattern: str) -> Callable[[str, dict], str]:
     return substitute
 
 
-substitute_template = custom_template(r"\[\[\$(\w+)\]\]")
+_TEMPLATE_PLACEHOLDER = r"\[\[\$(\w+)\]\]"
+
+substitute_template = custom_template(_TEMPLATE_PLACEHOLDER)
+
+
+def compile_template(text: str) -> Callable[[dict], str]:
+    """Pre-splits a constant ``substitute_template`` template.
+
+    The placeholders are located once, so each render is a single join.
+    """
+    parts = re.split(_TEMPLATE_PLACEHOLDER, text)
+    # re.split alternates literal text and captured placeholder names
+    literals, keys = parts[0::2], parts[1::2]
+
+    def render(values: dict) -> str:
+        pieces = [literals[0]]
+        for key, literal in zip(keys, literals[1:]):
+            pieces.append(str(values[key]))
+            pieces.append(literal)
+        return "".join(pieces)
+
+    return render
 
 
 def dates_equal_to_minute(date1: datetime, date2: datetime) -> bool:
@@ -711,6 +767,12 @@ def format_date_with_ordinal(d: datetime_date) -> str:
     return f"{day}{suffix} {d.strftime('%B %Y')}"
 
 
+@lru_cache(maxsize=64)
+def get_zoneinfo(tz: str) -> ZoneInfo:
+    """Memoized ``ZoneInfo(tz)`` for the per-request user timezone lookups."""
+    return ZoneInfo(tz)
+
+
 def tzinfo_from_str(tz: str):
     try:
         return ZoneInfo(tz)
@@ -725,6 +787,55 @@ def to_local(dt: datetime, tz_str: str) -> datetime:
     return dt.astimezone(tzinfo)
 
 
+# Longest window over which matching offsets at both ends are trusted to mean
+# no DST transition happened in between.
+BULK_TZ_MAX_SPAN = timedelta(days=28)
+# How far before the earliest event the offset must also match. Wall times in
+# the repeated hour after a fall-back transition need fold=1, which the
+# arithmetic path doesn't set, so windows that start just after one fall back.
+BULK_TZ_FOLD_MARGIN = timedelta(days=1)
+
+SpecT = TypeVar("SpecT", bound=DBActivitySpec)
+
+
+def bulk_to_tz(specs: Sequence[SpecT], tz: tzinfo) -> list[SpecT]:
+    """Converts every spec's events to ``tz``.
+
+    When the events all fall between the same two DST transitions of ``tz``,
+    and not just after one, the UTC offset is looked up once and applied
+    arithmetically, instead of calling ``astimezone`` per event. Otherwise
+    falls back to ``to_tz``.
+    Specs whose events are already in ``tz`` are returned as they are.
+    """
+    event_times = [event.event_time for spec in specs for event in spec.events]
+    if not event_times or any(t.utcoffset() is None for t in event_times):
+        return [spec.to_tz(tz) for spec in specs]
+    if all(t.tzinfo is tz for t in event_times):
+        return list(specs)
+
+    earliest, latest = min(event_times), max(event_times)
+    offset = earliest.astimezone(tz).utcoffset()
+    if (
+        latest - earliest > BULK_TZ_MAX_SPAN
+        or latest.astimezone(tz).utcoffset() != offset
+        or (earliest - BULK_TZ_FOLD_MARGIN).astimezone(tz).utcoffset() != offset
+    ):
+        return [spec.to_tz(tz) for spec in specs]
+
+    def convert(dt: datetime) -> datetime:
+        return (dt.replace(tzinfo=None) - dt.utcoffset() + offset).replace(tzinfo=tz)
+
+    return [
+        spec.with_events(
+            [
+                event.model_copy(update={"event_time": convert(event.event_time)})
+                for event in spec.events
+            ]
+        )
+        for spec in specs
+    ]
+
+
 def format_recent_or_ordinal(
     dt: datetime | None, tz_str: str, *, now: datetime | None = None
 ) -> str:
@@ -0,0 +1,35 @@
+// Alpine state for the home page graphs and controls.
+// Usage: x-data="homeXData({reference_date, reference_ts, view_mode, selected_tag_ids, offset})"
+window.homeXData = function (state) {
+  return {
+    reference_date: state.reference_date,
+    // Epoch seconds of reference_date in the user's timezone, sent to the server
+    reference_ts: state.reference_ts,
+    view_mode: state.view_mode,
+    selected_tag_ids: state.selected_tag_ids,
+    offset: state.offset,
+
+    dispatch_events() {
+      this.$dispatch('update_unified_diagram');
+    },
+
+    init() {
+      this.$watch('view_mode', () => {
+        // Resetting the offset triggers its own watcher, which refreshes
+        if (this.offset != 0) {
+          this.offset = 0;
+        } else {
+          this.dispatch_events();
+          this.$dispatch('date_range_changed');
+        }
+      });
+      this.$watch('selected_tag_ids', () => {
+        this.dispatch_events();
+      });
+      this.$watch('offset', () => {
+        this.$dispatch('date_range_changed');
+        this.dispatch_events();
+      });
+    },
+  };
+};
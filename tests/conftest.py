@@ -1,7 +1,12 @@
+from datetime import datetime
 import os
+from pathlib import Path
+import sqlite3
 
+import aiosqlite
 import pytest
 
+from clepsy.db import adapters, converters
 from clepsy.entities import (
     ImageProcessingApproach,
     UserSettings,
@@ -33,3 +38,20 @@ def mock_user_settings(mock_llm_config):
         productivity_prompt="Focus on deep work and minimize distractions",
         image_processing_approach=ImageProcessingApproach.VLM,
     )
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "migrations"
+
+
+@pytest.fixture
+def migrated_db_path(tmp_path) -> Path:
+    """An empty SQLite database with every migration's Up section applied."""
+    aiosqlite.register_adapter(datetime, adapters.adapt_timestamp)
+    aiosqlite.register_converter("DATETIME", converters.convert_date)
+
+    path = tmp_path / "db.sqlite3"
+    conn = sqlite3.connect(path)
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(migration.read_text().split("-- +goose Down")[0])
+    conn.close()
+    return path
@@ -0,0 +1,93 @@
+"""Sessionization writes must invalidate the cached home diagram specs."""
+
+from datetime import datetime, timedelta, timezone
+from functools import partial
+import sqlite3
+from types import SimpleNamespace
+
+from clepsy.db import adapters
+from clepsy.db.db import get_db_connection
+from clepsy.db.queries import select_data_revision
+from clepsy.entities import Session, SessionSpec, ViewMode
+from clepsy.modules.home.service import build_diagram_context
+from clepsy.modules.sessions import tasks
+
+
+REFERENCE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ACTIVITY_ID = 1
+
+
+def _add_activity(db_path) -> None:
+    opened = REFERENCE_DATE + timedelta(hours=9)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO activities (id, name, description, productivity_level, source)"
+        " VALUES (?, 'Coding', '', 'productive', 'auto')",
+        (ACTIVITY_ID,),
+    )
+    conn.executemany(
+        "INSERT INTO activity_events (activity_id, event_time, event_type)"
+        " VALUES (?, ?, ?)",
+        [
+            (ACTIVITY_ID, adapters.adapt_timestamp(opened), "open"),
+            (
+                ACTIVITY_ID,
+                adapters.adapt_timestamp(opened + timedelta(hours=1)),
+                "close",
+            ),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+async def test_session_insert_misses_the_diagram_cache(migrated_db_path, monkeypatch):
+    _add_activity(migrated_db_path)
+    connect = partial(
+        get_db_connection, db_path=migrated_db_path, include_uuid_func=False
+    )
+    monkeypatch.setattr(tasks, "get_db_connection", connect)
+    # Skip window validation; only the save transaction is under test
+    monkeypatch.setattr(
+        tasks,
+        "finalize_isolated_carry_over_sessions",
+        lambda **_: (
+            [
+                SessionSpec(
+                    session=Session(name="Deep work", llm_id="s1"),
+                    activity_ids=[ACTIVITY_ID],
+                )
+            ],
+            [],
+        ),
+    )
+
+    async def diagram_context():
+        async with connect() as conn:
+            revision = await select_data_revision(conn)
+            context = await build_diagram_context(
+                conn,
+                user_settings=SimpleNamespace(timezone="UTC"),
+                view_mode=ViewMode.DAILY,
+                offset=0,
+                reference_date_user_tz=REFERENCE_DATE,
+                selected_tag_ids=[],
+            )
+        return revision, context
+
+    revision_before, context = await diagram_context()
+    [spec] = context.activity_specs
+    assert spec.session is None
+
+    await tasks.finalize_carry_over_sessions_and_save(
+        carry_over_candidate_session_specs=[],
+        specs_not_finalized=[],
+        candidate_creation_interval_start=REFERENCE_DATE,
+        candidate_creation_interval_end=REFERENCE_DATE + timedelta(days=1),
+    )
+
+    revision_after, context = await diagram_context()
+    [spec] = context.activity_specs
+    assert revision_after == revision_before + 1
+    assert spec.session is not None
+    assert spec.session.name == "Deep work"
@@ -0,0 +1,52 @@
+"""Tests for the home page tag filter."""
+
+import pytest
+
+from clepsy.entities import (
+    DBActivity,
+    DBActivitySpecWithTagsAndSessions,
+    DBTag,
+    ProductivityLevel,
+    Source,
+)
+from clepsy.modules.home.service import filter_activities_by_tags
+
+
+def make_spec(
+    activity_id: int, tag_ids: list[int]
+) -> DBActivitySpecWithTagsAndSessions:
+    activity = DBActivity(
+        id=activity_id,
+        name=f"Activity {activity_id}",
+        description="",
+        productivity_level=ProductivityLevel.NEUTRAL,
+        last_manual_action_time=None,
+        source=Source.AUTO,
+    )
+    tags = [DBTag(id=i, name=f"tag {i}", description="") for i in tag_ids]
+    return DBActivitySpecWithTagsAndSessions(activity=activity, events=[], tags=tags)
+
+
+SPECS = [make_spec(1, [1]), make_spec(2, [2, 3]), make_spec(3, [])]
+
+
+@pytest.mark.parametrize(
+    ("selected_tag_ids", "expected"),
+    [
+        ([], [1, 2, 3]),
+        ([1], [1]),
+        ([3], [2]),
+        ([-1], [3]),
+        ([1, -1], [1, 3]),
+        ([4], []),
+        # Ids straight from the request: never shifted, they match nothing
+        ([-2], []),
+        ([-5, 3], [2]),
+        ([10_000_000_000], []),
+        ([10_000_000_000, -1], [3]),
+    ],
+)
+def test_filter_activities_by_tags(selected_tag_ids, expected):
+    filtered = filter_activities_by_tags(SPECS, selected_tag_ids)
+
+    assert [spec.activity.id for spec in filtered] == expected
@@ -0,0 +1,68 @@
+from PIL import Image
+import pytest
+
+from clepsy.modules.ocr import ocr
+
+
+class _FakeOcr:
+    """Reads each image's width back as text, so results can be traced to inputs."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls: list[int] = []
+
+    def _result(self, image) -> dict:
+        height, width = image.shape[:2]
+        if width == 1:
+            return {"rec_texts": [], "rec_scores": [], "rec_boxes": []}
+        return {
+            "rec_texts": ["width", str(width), ","],
+            "rec_scores": [0.9, 0.9, 0.9],
+            "rec_boxes": [[0, 0, 10, 10], [12, 0, 20, 10], [21, 0, 22, 10]],
+        }
+
+    def predict(self, input, **kwargs):
+        if self.fail:
+            raise RuntimeError("predict failed")
+        if isinstance(input, list):
+            self.calls.append(len(input))
+            return [self._result(image) for image in input]
+        self.calls.append(1)
+        return [self._result(input)]
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    fake = _FakeOcr()
+    monkeypatch.setattr(ocr, "get_ocr", lambda *args, **kwargs: fake)
+    return fake
+
+
+def _images(*widths: int) -> list[Image.Image]:
+    return [Image.new("RGB", (width, 8)) for width in widths]
+
+
+def test_ocr_ui_text_batch_keeps_input_order(fake_ocr):
+    images = _images(30, 10, 1, 20)
+
+    texts = ocr.ocr_ui_text_batch(images)
+
+    assert texts == ["width 30,", "width 10,", "", "width 20,"]
+    assert fake_ocr.calls == [4]
+
+
+def test_ocr_ui_text_batch_matches_single_image_path(fake_ocr):
+    images = _images(640, 3000, 1)
+
+    assert ocr.ocr_ui_text_batch(images) == [ocr.ocr_ui_text(i) for i in images]
+
+
+def test_ocr_ui_text_batch_returns_empty_text_per_image_on_failure(fake_ocr):
+    fake_ocr.fail = True
+
+    assert ocr.ocr_ui_text_batch(_images(30, 10)) == ["", ""]
+
+
+def test_ocr_ui_text_batch_skips_predict_for_no_images(fake_ocr):
+    assert ocr.ocr_ui_text_batch([]) == []
+    assert fake_ocr.calls == []
@@ -1,6 +1,12 @@
+from multiprocessing.connection import Listener
+import threading
+
 import pytest
 
-from clepsy.modules.pii.pii import anonymize_text
+from clepsy.config import config
+from clepsy.modules.pii import pii
+from clepsy.modules.pii.inference_server import _handle
+from clepsy.modules.pii.pii import anonymize_text, anonymize_texts
 
 
 @pytest.mark.pii
@@ -97,3 +103,103 @@ def test_anonymize_text_redacts_api_key():
 
     assert "sk-test-abc123XYZ" not in redacted
     assert "<REDACTED:API KEY>" in redacted
+
+
+class _FakeModel:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+    def batch_predict_entities(self, texts, labels, threshold):
+        if self.error is not None:
+            raise self.error
+        return [[] for _ in texts]
+
+
+def _serve_once(address: str, model: _FakeModel) -> threading.Thread:
+    listener = Listener(address, family="AF_UNIX", authkey=pii.gliner_server_authkey())
+
+    def run():
+        with listener:
+            _handle(listener.accept(), model, threading.Lock())
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_gliner_server_reports_inference_errors(tmp_path):
+    address = str(tmp_path / "gliner.sock")
+    thread = _serve_once(address, _FakeModel(ValueError("boom")))
+
+    with pytest.raises(pii.GlinerServerError, match="ValueError: boom"):
+        pii._predict_remote(address, ["text"], ["email address"], 0.5)
+    thread.join(timeout=5)
+
+
+def test_gliner_server_returns_entities_per_text(tmp_path):
+    address = str(tmp_path / "gliner.sock")
+    thread = _serve_once(address, _FakeModel())
+
+    entities = pii._predict_remote(address, ["a", "b"], ["email address"], 0.5)
+
+    assert entities == [[], []]
+    thread.join(timeout=5)
+
+
+def test_unreachable_gliner_server_falls_back_to_local_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "gliner_server_address", str(tmp_path / "missing.sock"))
+    monkeypatch.setattr(pii, "get_gliner_model", lambda **_: _FakeModel())
+
+    assert pii._predict_entities(["text"], None, ["email address"], 0.5) == [[]]
+
+
+class _ScriptedModel:
+    """Returns fixed entities per text, as GLiNER's batch API would."""
+
+    def __init__(self, entities_by_text: dict[str, list[tuple[int, int, str]]]):
+        self.entities_by_text = entities_by_text
+
+    def batch_predict_entities(self, texts, labels, threshold):
+        return [
+            [
+                {"start": start, "end": end, "label": label}
+                for start, end, label in self.entities_by_text.get(text, [])
+            ]
+            for text in texts
+        ]
+
+
+def test_anonymize_texts_matches_per_text_anonymize_text():
+    model = _ScriptedModel(
+        {
+            "mail alice@example.com or bob@example.com": [
+                # Out of order, as the model may return them
+                (26, 41, "email"),
+                (5, 22, "email"),
+            ],
+            "call Alice Smith on 555-0100": [
+                (5, 16, "person"),
+                (5, 10, "first name"),
+                (20, 28, "phone number"),
+            ],
+            "keys ABCDEFGH": [(5, 11, "api key"), (9, 13, "password")],
+            "nothing to see": [],
+        }
+    )
+    texts = list(model.entities_by_text) + [""]
+
+    batched = anonymize_texts(texts, model=model)
+
+    assert batched == [anonymize_text(text, model=model) for text in texts]
+    assert batched == [
+        "mail <REDACTED:EMAIL> or <REDACTED:EMAIL>",
+        # Nested and overlapping spans leak none of the covered characters
+        "call <REDACTED:PERSON><REDACTED:FIRST NAME> on <REDACTED:PHONE NUMBER>",
+        "keys <REDACTED:API KEY><REDACTED:PASSWORD>",
+        "nothing to see",
+        "",
+    ]
+
+
+def test_anonymize_texts_skips_the_model_for_no_texts():
+    assert anonymize_texts([], model=_FakeModel(RuntimeError("called"))) == []
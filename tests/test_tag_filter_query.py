@@ -0,0 +1,92 @@
+"""Tests for the SQL tag filter of select_specs_with_tags_in_time_range."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sqlite3
+
+import pytest
+
+from clepsy.db import adapters
+from clepsy.db.db import get_db_connection
+from clepsy.db.queries import select_specs_with_tags_in_time_range
+
+
+WINDOW_START = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+WINDOW_END = datetime(2024, 1, 1, 18, 0, tzinfo=timezone.utc)
+
+WORK, PERSONAL, MISC = 1, 2, 3
+CODING, READING, IDLE, EMAIL = 1, 2, 3, 4
+
+
+@pytest.fixture
+def db_path(migrated_db_path: Path) -> Path:
+    conn = sqlite3.connect(migrated_db_path)
+    conn.executemany(
+        "INSERT INTO tags (id, name, description, deleted_at) VALUES (?, ?, ?, ?)",
+        [
+            (WORK, "work", "Work", None),
+            # A deleted tag doesn't count: its activities are untagged
+            (PERSONAL, "personal", "Personal", "2024-01-01T00:00:00"),
+            (MISC, "misc", "Misc", None),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO activities (id, name, description, productivity_level, source)"
+        " VALUES (?, ?, '', 'neutral', 'auto')",
+        [(CODING, "Coding"), (READING, "Reading"), (IDLE, "Idle"), (EMAIL, "Email")],
+    )
+    conn.executemany(
+        "INSERT INTO tag_mappings (tag_id, activity_id) VALUES (?, ?)",
+        [(WORK, CODING), (PERSONAL, READING), (WORK, EMAIL), (MISC, EMAIL)],
+    )
+    opened = WINDOW_START + timedelta(hours=1)
+    conn.executemany(
+        "INSERT INTO activity_events (activity_id, event_time, event_type)"
+        " VALUES (?, ?, ?)",
+        [
+            (activity_id, adapters.adapt_timestamp(t), event_type)
+            for activity_id in (CODING, READING, IDLE, EMAIL)
+            for t, event_type in (
+                (opened, "open"),
+                (opened + timedelta(minutes=30), "close"),
+            )
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return migrated_db_path
+
+
+@pytest.mark.parametrize(
+    ("tag_ids", "include_untagged", "expected"),
+    [
+        (None, False, {CODING, READING, IDLE, EMAIL}),
+        ([WORK], False, {CODING, EMAIL}),
+        ([MISC], False, {EMAIL}),
+        ([PERSONAL], False, set()),
+        ([], True, {READING, IDLE}),
+        ([MISC], True, {READING, IDLE, EMAIL}),
+        ([], False, set()),
+    ],
+)
+async def test_tag_filter_matches_ui_selection(
+    db_path, tag_ids, include_untagged, expected
+):
+    async with get_db_connection(db_path=db_path, include_uuid_func=False) as conn:
+        specs = await select_specs_with_tags_in_time_range(
+            conn,
+            start=WINDOW_START,
+            end=WINDOW_END,
+            tag_ids=tag_ids,
+            include_untagged=include_untagged,
+        )
+
+    assert {spec.activity.id for spec in specs} == expected
+    # Specs keep all their live tags, not only the selected ones
+    tags_by_activity = {
+        spec.activity.id: {tag.id for tag in spec.tags} for spec in specs
+    }
+    if EMAIL in tags_by_activity:
+        assert tags_by_activity[EMAIL] == {WORK, MISC}
+    if READING in tags_by_activity:
+        assert tags_by_activity[READING] == set()
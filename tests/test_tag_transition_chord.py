@@ -0,0 +1,74 @@
+"""Tests for the tag transition chord interval helpers."""
+
+from datetime import datetime, timedelta, timezone
+import random
+
+import pytest
+
+from clepsy.entities import (
+    ActivityEventType,
+    DBActivity,
+    DBActivityEvent,
+    DBActivitySpecWithTags,
+    ProductivityLevel,
+    Source,
+)
+from clepsy.modules.insights.components import tag_transition_chord
+
+
+BASE = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def make_spec(event_types: list[ActivityEventType]) -> DBActivitySpecWithTags:
+    activity = DBActivity(
+        id=1,
+        name="Coding",
+        description="Writing code",
+        productivity_level=ProductivityLevel.PRODUCTIVE,
+        last_manual_action_time=None,
+        source=Source.AUTO,
+    )
+    events = [
+        DBActivityEvent(
+            id=i,
+            event_time=BASE + timedelta(minutes=5 * i),
+            event_type=event_type,
+            activity_id=activity.id,
+            aggregation_id=None,
+            last_manual_action_time=None,
+        )
+        for i, event_type in enumerate(event_types)
+    ]
+    return DBActivitySpecWithTags(activity=activity, events=events, tags=[])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize(
+    ("window_start", "window_end"),
+    [
+        (BASE - timedelta(hours=1), BASE + timedelta(days=1)),
+        (BASE + timedelta(minutes=42), BASE + timedelta(hours=4, minutes=3)),
+    ],
+)
+def test_vectorized_intervals_match_loop(monkeypatch, seed, window_start, window_end):
+    rng = random.Random(seed)
+    # Irregular sequences (repeated opens/closes, trailing open) exercise the
+    # same state machine edge cases as the loop
+    spec = make_spec(
+        [
+            rng.choice([ActivityEventType.OPEN, ActivityEventType.CLOSE])
+            for _ in range(tag_transition_chord._VECTORIZE_MIN_EVENTS + 16)
+        ]
+        + [ActivityEventType.OPEN]
+    )
+
+    vectorized = tag_transition_chord._activity_intervals_within_window(
+        spec, window_start, window_end
+    )
+    monkeypatch.setattr(tag_transition_chord, "_VECTORIZE_MIN_EVENTS", 10**9)
+    looped = tag_transition_chord._activity_intervals_within_window(
+        spec, window_start, window_end
+    )
+
+    assert vectorized == looped
+    assert looped
@@ -1,14 +1,30 @@
 from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 
+import numpy as np
 import pytest
 
-from clepsy.entities import ActivityEvent, ActivityEventType, TimeSpan
+from clepsy.entities import (
+    ActivityEvent,
+    ActivityEventType,
+    DBActivity,
+    DBActivityEvent,
+    DBActivitySpecWithTags,
+    DBTag,
+    ProductivityLevel,
+    Source,
+    TimeSpan,
+)
 from clepsy.utils import (
+    bulk_to_tz,
     calculate_activity_gaps,
     calculate_duration,
+    compile_template,
     extract_islands,
+    json_dumps,
     overlapping_subarray_split,
     parse_mm_ss_string,
+    substitute_template,
     truncate_words,
 )
 
@@ -400,3 +416,103 @@ def test_overlapping_subarray_split_high_overlap():
         [0, 1, 2],
         [2, 3, 4],
     ]
+
+
+def _spec_with_events(*event_times: datetime) -> DBActivitySpecWithTags:
+    activity = DBActivity(
+        id=1,
+        name="Coding",
+        description="Writing code",
+        productivity_level=ProductivityLevel.PRODUCTIVE,
+        last_manual_action_time=None,
+        source=Source.AUTO,
+    )
+    events = [
+        DBActivityEvent(
+            id=i,
+            event_time=t,
+            event_type=(
+                ActivityEventType.OPEN if i % 2 == 0 else ActivityEventType.CLOSE
+            ),
+            aggregation_id=None,
+            activity_id=activity.id,
+            last_manual_action_time=None,
+        )
+        for i, t in enumerate(event_times)
+    ]
+    return DBActivitySpecWithTags(
+        activity=activity,
+        events=events,
+        tags=[DBTag(id=3, name="work", description="Work")],
+    )
+
+
+@pytest.mark.parametrize(
+    "event_times",
+    [
+        # Same offset throughout: fast path
+        (
+            datetime(2024, 7, 1, 9, 0, tzinfo=timezone.utc),
+            datetime(2024, 7, 1, 17, 30, tzinfo=timezone.utc),
+        ),
+        # Crosses the spring-forward transition: per-event fallback
+        (
+            datetime(2024, 3, 31, 0, 30, tzinfo=timezone.utc),
+            datetime(2024, 3, 31, 1, 30, tzinfo=timezone.utc),
+        ),
+        # Both ends in the repeated hour after the fall-back transition: the
+        # wall times are ambiguous and need fold=1
+        (
+            datetime(2024, 10, 27, 1, 15, tzinfo=timezone.utc),
+            datetime(2024, 10, 27, 1, 45, tzinfo=timezone.utc),
+        ),
+    ],
+)
+def test_bulk_to_tz_matches_to_tz(event_times):
+    tz = ZoneInfo("Europe/Amsterdam")
+    spec = _spec_with_events(*event_times)
+
+    (converted,) = bulk_to_tz([spec], tz)
+    expected = spec.to_tz(tz)
+
+    assert isinstance(converted, DBActivitySpecWithTags)
+    assert converted.tags == spec.tags
+    for got, want in zip(converted.events, expected.events):
+        assert got.event_time == want.event_time
+        assert got.event_time.tzinfo is tz
+        assert got.event_time.utcoffset() == want.event_time.utcoffset()
+        assert got.event_time.timestamp() == want.event_time.timestamp()
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{ a: '[[$a]]', b: [[$b]] }",
+        "[[$a]][[$b]][[$a]]",
+        "no placeholders",
+        "",
+    ],
+)
+def test_compile_template_matches_substitute_template(template):
+    values = {"a": "x", "b": 3}
+
+    assert compile_template(template)(values) == substitute_template(template, values)
+
+
+def test_json_dumps_encodes_datetimes_and_numpy_values():
+    payload = {
+        "at": datetime(2024, 1, 1, 8, 30),
+        "at_utc": datetime(2024, 1, 1, 8, 30, tzinfo=timezone.utc),
+        "matrix": np.array([[1, 2], [3, 4]]),
+        "total": np.int64(7),
+    }
+
+    assert json_dumps(payload) == (
+        '{"at": "2024-01-01T08:30:00", "at_utc": "2024-01-01T08:30:00+00:00", '
+        '"matrix": [[1, 2], [3, 4]], "total": 7}'
+    )
+
+
+def test_json_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError, match="object is not JSON serializable"):
+        json_dumps({"value": object()})